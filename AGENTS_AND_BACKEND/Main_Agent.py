@@ -1,13 +1,21 @@
 import json
-from filter_agent import ArgoFloatAgent
+import os
+import threading
+from filter_agent import DEFAULT_MAX_CONCURRENCY, get_argo_agent
 from sql_agent import run_agent
+from sql_governor import QueryRejected
 from langgraph.graph import StateGraph, END
 from typing import TypedDict, List, Literal
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
-from sort_json import sort_cycles_in_floats
 from dotenv import load_dotenv
+
+load_dotenv()
+API_KEY = os.environ.get("GOOGLE_API_KEY")
+# Sub-queries the filter agent runs at once (read after .env is loaded)
+FILTER_CONCURRENCY = int(os.environ.get("ARGO_FILTER_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+
 class State(TypedDict):
     user_query: str
     dec_queries: List[str]
@@ -16,9 +24,31 @@ class State(TypedDict):
     decision: str
 
 
-model = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-)
+_model = None
+_structured_models = {}
+_init_lock = threading.Lock()
+
+
+def get_model() -> ChatGoogleGenerativeAI:
+    """Gemini client shared by the orchestration nodes, created on first use."""
+    global _model
+    if _model is None:
+        with _init_lock:
+            if _model is None:
+                _model = ChatGoogleGenerativeAI(
+                    model="gemini-2.5-flash",
+                )
+    return _model
+
+
+def get_structured_model(schema):
+    """Structured-output wrapper for a schema, built once and reused across requests."""
+    structured = _structured_models.get(schema)
+    if structured is None:
+        structured = get_model().with_structured_output(schema)
+        with _init_lock:
+            structured = _structured_models.setdefault(schema, structured)
+    return structured
 
 
 class Decomposed_Queries(BaseModel):
@@ -59,7 +89,7 @@ def check_relevance(state: State) -> State:
         ]
     )
     prompt = relevance_prompt.format(query=state["user_query"])
-    relevance_result = model.with_structured_output(RelevanceCheck).invoke(prompt)
+    relevance_result = get_structured_model(RelevanceCheck).invoke(prompt)
 
     if relevance_result.category == "irrelevant":
         return {
@@ -100,7 +130,7 @@ def decompose_query(state: State) -> State:
         ]
     )
     prompt = promts.format(query=state["user_query"])
-    response = model.with_structured_output(Decomposed_Queries).invoke(prompt)
+    response = get_structured_model(Decomposed_Queries).invoke(prompt)
     return {
         **state,
         "dec_queries": [response.for_filter_agent, response.for_sql_agent],
@@ -122,18 +152,22 @@ def execute_queries(state: State) -> State:
     if state.get("decision") == "yes":
         return state
         
-    argo_agent = ArgoFloatAgent(API_KEY)
+    argo_agent = get_argo_agent(API_KEY, FILTER_CONCURRENCY)
     filtered = argo_agent.query(state["dec_queries"][0])
 
     # ask LLM if we only need IDs or run SQL
     decision_prompt = f"User query: {state['user_query']}\nFloat IDs: {json.dumps(filtered)}"
-    decision = model.with_structured_output(OutPut).invoke(decision_prompt)
+    decision = get_structured_model(OutPut).invoke(decision_prompt)
     print(decision.response,decision.decision)
     if decision.decision.lower() == "yes":
         return {**state, "response": decision.response, "decision": decision.decision}
 
-    results = run_agent(state["dec_queries"][1], filtered)
-    results = sort_cycles_in_floats(results)
+    # Rows are streamed in float/cycle order, so no separate sort pass is needed
+    notes = []
+    try:
+        results = run_agent(state["dec_queries"][1], filtered, notes=notes)
+    except QueryRejected as e:
+        return {**state, "response": str(e), "decision": decision.decision}
     import os
 
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -142,7 +176,11 @@ def execute_queries(state: State) -> State:
     with open(json_path, "w") as f:
         json.dump(results, f, indent=2, default=str)
 
-    return {**state, "data": results, "decision": decision.decision, "response": decision.response}
+    response = decision.response
+    if notes:
+        # The governor shrank the result to fit the query budget; say so
+        response += "\n\nNote: the results were reduced to stay within the query budget (" + "; ".join(notes) + ")."
+    return {**state, "data": results, "decision": decision.decision, "response": response}
 
 state: State = {
     "user_query": "compare temperature of any one float in bay of bengal and one float in arabian sea",
@@ -152,16 +190,27 @@ state: State = {
     "decision": "",
 }
 
-workflow = StateGraph(State)
-workflow.add_node("check_relevance", check_relevance)
-workflow.add_node("decompose_query", decompose_query)
-workflow.add_node("execute_queries", execute_queries)
-workflow.add_edge("check_relevance", "decompose_query")
-workflow.add_edge("decompose_query", "execute_queries")
-workflow.add_edge("execute_queries", END)
-workflow.set_entry_point("check_relevance")
-graph = workflow.compile()
-# graph.invoke(state)
+_graph = None
+
+
+def get_graph():
+    """Compile the orchestration graph once, on first use."""
+    global _graph
+    if _graph is not None:
+        return _graph
+    with _init_lock:
+        if _graph is None:
+            workflow = StateGraph(State)
+            workflow.add_node("check_relevance", check_relevance)
+            workflow.add_node("decompose_query", decompose_query)
+            workflow.add_node("execute_queries", execute_queries)
+            workflow.add_edge("check_relevance", "decompose_query")
+            workflow.add_edge("decompose_query", "execute_queries")
+            workflow.add_edge("execute_queries", END)
+            workflow.set_entry_point("check_relevance")
+            _graph = workflow.compile()
+    return _graph
+# get_graph().invoke(state)
 
 def run_agent_query(user_query: str):
     state: State = {
@@ -171,4 +220,4 @@ def run_agent_query(user_query: str):
         "response": "",
         "decision": "",
     }
-    return graph.invoke(state)
\ No newline at end of file
+    return get_graph().invoke(state)
\ No newline at end of file
@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+import psycopg2
+from psycopg2 import extensions, pool
+
+
+# --- DB connection settings (override through the environment / .env) ---
+DB_CONFIG = {
+    "host": os.environ.get("ARGO_DB_HOST", "localhost"),
+    "port": int(os.environ.get("ARGO_DB_PORT", "5432")),
+    "dbname": os.environ.get("ARGO_DB_NAME", "argo_db"),
+    "user": os.environ.get("ARGO_DB_USER", "argo_user"),
+    "password": os.environ.get("ARGO_DB_PASSWORD", "argo_pass"),
+}
+DB_POOL_MIN = int(os.environ.get("ARGO_DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.environ.get("ARGO_DB_POOL_MAX", "10"))
+# Default server-side limit for any single statement
+STATEMENT_TIMEOUT_MS = int(os.environ.get("ARGO_DB_STATEMENT_TIMEOUT_MS", "30000"))
+# Connections idle for longer than this are pinged before being handed out
+HEALTH_CHECK_AFTER_SECONDS = 30.0
+
+_pool: Optional[pool.ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
+# ThreadedConnectionPool raises when exhausted; the semaphore makes callers wait instead
+_slots = threading.BoundedSemaphore(DB_POOL_MAX)
+_last_used = {}
+
+
+def connect(**overrides):
+    """Open a standalone connection (for scripts such as sql_setup.py)."""
+    return psycopg2.connect(**{**DB_CONFIG, **overrides})
+
+
+def get_pool() -> pool.ThreadedConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = pool.ThreadedConnectionPool(
+                    DB_POOL_MIN, DB_POOL_MAX,
+                    options=f"-c statement_timeout={STATEMENT_TIMEOUT_MS}",
+                    **DB_CONFIG,
+                )
+    return _pool
+
+
+def _is_broken(conn) -> bool:
+    return bool(conn.closed) or conn.get_transaction_status() == extensions.TRANSACTION_STATUS_UNKNOWN
+
+
+def _is_healthy(conn) -> bool:
+    if _is_broken(conn):
+        return False
+    last_used = _last_used.get(id(conn))
+    if last_used is None or time.monotonic() - last_used < HEALTH_CHECK_AFTER_SECONDS:
+        return True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+def _checkout():
+    db_pool = get_pool()
+    # Drop connections the server has closed since they were last used
+    for _ in range(DB_POOL_MAX + 1):
+        conn = db_pool.getconn()
+        if _is_healthy(conn):
+            return conn
+        _last_used.pop(id(conn), None)
+        db_pool.putconn(conn, close=True)
+    raise psycopg2.OperationalError("Could not obtain a healthy database connection")
+
+
+def _checkin(conn):
+    broken = _is_broken(conn)
+    if broken:
+        _last_used.pop(id(conn), None)
+    else:
+        _last_used[id(conn)] = time.monotonic()
+    get_pool().putconn(conn, close=broken)
+
+
+@contextmanager
+def connection(statement_timeout_ms: Optional[int] = None):
+    """
+    Check a pooled connection out for the duration of a request. The work runs
+    in one transaction: committed on success, rolled back on error. Pass
+    statement_timeout_ms to tighten the timeout for this transaction only.
+    """
+    _slots.acquire()
+    conn = None
+    try:
+        conn = _checkout()
+        if statement_timeout_ms is not None:
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL statement_timeout = %s", (int(statement_timeout_ms),))
+        yield conn
+        conn.commit()
+    except Exception:
+        if conn is not None and not _is_broken(conn):
+            conn.rollback()
+        raise
+    finally:
+        if conn is not None:
+            _checkin(conn)
+        _slots.release()
+
+
+def run_with_retry(work: Callable[[Any], Any], retries: int = 1, statement_timeout_ms: Optional[int] = None) -> Any:
+    """
+    Run work(conn) on a pooled connection. If the connection drops mid-request
+    the work is retried on a fresh one; timeouts and SQL errors are not retried.
+    """
+    for attempt in range(retries + 1):
+        try:
+            with connection(statement_timeout_ms) as conn:
+                return work(conn)
+        except extensions.QueryCanceledError:
+            raise
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            if attempt == retries:
+                raise
+            print(f"Database connection lost ({e}); retrying on a fresh connection")
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+            _last_used.clear()
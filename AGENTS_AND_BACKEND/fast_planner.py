@@ -0,0 +1,225 @@
+import re
+import threading
+from datetime import date
+from typing import List, Dict, Any, Optional, Union
+
+from float_index import PARAMETER_ALIASES
+
+
+# Named regions the filter agent knows about (same boxes the LLM prompt uses)
+REGIONS = {
+    'Bay of Bengal': {'lat_min': 5, 'lat_max': 22, 'lon_min': 80, 'lon_max': 95},
+    'Arabian Sea': {'lat_min': 8, 'lat_max': 25, 'lon_min': 50, 'lon_max': 75},
+    'Indian Ocean': {'lat_min': -30, 'lat_max': 30, 'lon_min': 30, 'lon_max': 120},
+}
+
+PLATFORM_TYPES = ['apex', 'arvor', 'provor', 'nova', 'navis', 'solo']
+
+NUMBER_WORDS = {
+    'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+}
+
+EXTREMES = {
+    'hottest': ('temperature', 'max'), 'warmest': ('temperature', 'max'),
+    'coldest': ('temperature', 'min'), 'coolest': ('temperature', 'min'),
+    'deepest': ('pres', 'max'), 'shallowest': ('pres', 'min'),
+    'saltiest': ('psal', 'max'), 'freshest': ('psal', 'min'),
+}
+
+OPERATORS = [
+    ('greater than or equal to', '>='), ('less than or equal to', '<='),
+    ('at least', '>='), ('at most', '<='),
+    ('greater than', '>'), ('more than', '>'), ('higher than', '>'), ('above', '>'),
+    ('over', '>'), ('exceeding', '>'), ('less than', '<'), ('lower than', '<'),
+    ('below', '<'), ('under', '<'), ('equal to', '=='), ('equals', '=='),
+    ('>=', '>='), ('<=', '<='), ('>', '>'), ('<', '<'), ('=', '=='),
+]
+
+STAT_QUALIFIERS = {
+    'minimum': 'min', 'min': 'min', 'maximum': 'max', 'max': 'max',
+    'average': 'avg', 'avg': 'avg', 'mean': 'avg',
+}
+
+# Anything that changes the meaning of a query in ways the rules don't model
+UNSUPPORTED = re.compile(
+    r"\b(not|outside|except|excluding|exclude|without|nearest|closest|near|around|or(?!\s+equal)|"
+    r"latitude|longitude|lat|lon|km|kilometers?|miles?|compare)\b"
+)
+
+# Words that may remain once every recognised phrase has been removed
+FILLER_WORDS = {
+    'find', 'show', 'get', 'list', 'give', 'me', 'fetch', 'display', 'return', 'search', 'select', 'identify',
+    'which', 'what', 'are', 'is', 'were', 'was', 'there', 'please', 'can', 'you', 'i', 'want', 'need', 'see',
+    'all', 'the', 'floats', 'float', 'argo', 'in', 'from', 'of', 'with', 'that', 'have', 'has', 'having',
+    'whose', 'its', 'their', 'and', 'any', 'for', 'at', 'by', 'to', 'located', 'launched', 'deployed',
+    'region', 'area', 'data', 'ids', 'id', 'value', 'values', 'recorded', 'measured', 'degrees', 'degree',
+    'c', 'celsius', 'dbar', 'decibar', 'psu', 'only', 'some', 'those', 'these', 'available',
+}
+
+NUMBER = r"(\d+|" + "|".join(NUMBER_WORDS) + r")"
+
+
+# Compiled once; _plan runs on every filter query
+_PUNCTUATION = re.compile(r"[?!.,;:]+(\s|$)")
+_EXTREME = re.compile(r"\b(?:top\s+)?" + NUMBER + r"?\s*(" + "|".join(EXTREMES) + r")\s*" + NUMBER + r"?\s*(floats?)?\b")
+_COUNT = re.compile(r"\b(?:any\s+|first\s+|top\s+)?" + NUMBER + r"\s+floats?\b")
+_REGIONS = {name: re.compile(r"\b(?:the\s+)?" + name.lower() + r"\b") for name in REGIONS}
+_COMPARISON = re.compile(
+    r"\b(?:(" + "|".join(STAT_QUALIFIERS) + r")\s+)?("
+    + "|".join(sorted(PARAMETER_ALIASES, key=len, reverse=True)).replace('_', '[ _]') + r")\s+"
+    r"(?:values?\s+)?(?:is\s+|are\s+|of\s+)?(" + "|".join(re.escape(phrase) for phrase, _ in OPERATORS)
+    + r")\s*(-?\d+(?:\.\d+)?)"
+)
+_PLATFORM = re.compile(r"\b(" + "|".join(PLATFORM_TYPES) + r")\b")
+_WORD = re.compile(r"[a-z0-9_]+")
+_YEAR_RANGE = re.compile(r"\b(?:between|from)\s+(\d{4})\s+(?:and|to|-)\s+(\d{4})\b")
+_IN_YEAR = re.compile(r"\b(?:in|during)\s+(?:the\s+year\s+)?(\d{4})\b")
+_AFTER_YEAR = re.compile(r"\b(after|since)\s+(\d{4})\b")
+_BEFORE_YEAR = re.compile(r"\bbefore\s+(\d{4})\b")
+
+
+def _to_number(text: str) -> Union[int, float]:
+    value = float(text)
+    return int(value) if value.is_integer() and '.' not in text else value
+
+
+def _to_count(text: str) -> int:
+    return NUMBER_WORDS[text] if text in NUMBER_WORDS else int(text)
+
+
+class FastPlanner:
+    """
+    Rule-based planner for the query shapes the agent prompt spells out: named
+    regions, launch-year ranges, "parameter > value", platform types and
+    hottest/deepest style rankings.
+
+    plan() returns the same tool-call structures _parse_tool_calls produces, or
+    None when it is not confident, in which case the caller falls back to the LLM.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def plan(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        tool_calls = self._plan(query)
+        with self._lock:
+            if tool_calls is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return tool_calls
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    def _plan(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        text = " " + _PUNCTUATION.sub(" ", query.lower().replace("°c", " ")) + " "
+        if UNSUPPORTED.search(text):
+            return None
+
+        tool_calls = []
+        k: Union[int, str] = "all"
+
+        def consume(pattern: "re.Pattern"):
+            nonlocal text
+            match = pattern.search(text)
+            if match:
+                text = text[:match.start()] + " " + text[match.end():]
+            return match
+
+        # Rankings: "the hottest float", "5 deepest floats", "top 3 coldest"
+        extreme = consume(_EXTREME)
+        if extreme:
+            count = extreme.group(1) or extreme.group(3)
+            if count:
+                k = _to_count(count)
+            elif extreme.group(4) == 'floats':
+                return None
+            else:
+                k = 1
+            parameter, extreme_type = EXTREMES[extreme.group(2)]
+            tool_calls.append({'tool_name': 'find_extreme_values',
+                               'parameters': {'parameter': parameter, 'extreme_type': extreme_type}})
+
+        # Result counts: "one float", "any 3 floats", "all floats"
+        count = consume(_COUNT)
+        if count:
+            if extreme:
+                return None
+            k = _to_count(count.group(1))
+
+        regions = [name for name in REGIONS if name.lower() in text]
+        if len(regions) > 1:
+            return None
+        for name in regions:
+            consume(_REGIONS[name])
+            tool_calls.append({'tool_name': 'filter_by_coordinates', 'parameters': dict(REGIONS[name])})
+
+        date_range = self._date_range(consume)
+        if date_range == 'invalid':
+            return None
+        if date_range:
+            tool_calls.append({'tool_name': 'filter_by_date_range',
+                               'parameters': {'start_date': date_range[0], 'end_date': date_range[1]}})
+
+        while True:
+            comparison = consume(_COMPARISON)
+            if not comparison:
+                break
+            parameter = comparison.group(2).replace(' ', '_')
+            if comparison.group(1):
+                family = PARAMETER_ALIASES[parameter]
+                parameter = f"{family}_{STAT_QUALIFIERS[comparison.group(1)]}"
+            operator = dict(OPERATORS)[comparison.group(3)]
+            tool_calls.append({'tool_name': 'filter_by_parameter_value',
+                               'parameters': {'parameter': parameter, 'operator': operator,
+                                              'value': _to_number(comparison.group(4))}})
+
+        platform = consume(_PLATFORM)
+        if platform:
+            tool_calls.append({'tool_name': 'filter_by_platform_type',
+                               'parameters': {'platform_type': platform.group(1).upper()}})
+
+        leftover = [word for word in _WORD.findall(text) if word not in FILLER_WORDS]
+        if leftover or not tool_calls:
+            return None
+
+        if k != "all":
+            # A result limit is only unambiguous when there is a single tool call
+            if len(tool_calls) > 1:
+                return None
+            tool_calls[0]['parameters']['k'] = k
+        return tool_calls
+
+    def _date_range(self, consume) -> Union[None, str, tuple]:
+        """Launch-year phrases -> (start_date, end_date); 'invalid' for reversed ranges."""
+        match = consume(_YEAR_RANGE)
+        if match:
+            start, end = int(match.group(1)), int(match.group(2))
+            if start > end:
+                return 'invalid'
+            return f"{start}-01-01", f"{end}-12-31"
+        match = consume(_IN_YEAR)
+        if match:
+            return f"{match.group(1)}-01-01", f"{match.group(1)}-12-31"
+        match = consume(_AFTER_YEAR)
+        if match:
+            year = int(match.group(2)) + (1 if match.group(1) == 'after' else 0)
+            return f"{year}-01-01", date.today().isoformat()
+        match = consume(_BEFORE_YEAR)
+        if match:
+            return "1900-01-01", f"{int(match.group(1)) - 1}-12-31"
+        return None
+
+
+# Shared by every agent instance so the hit rate covers the whole process
+FAST_PLANNER = FastPlanner()
@@ -1,15 +1,18 @@
-import json
-import math
+import os
 import re
-from datetime import datetime, timedelta
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Union
-from dataclasses import dataclass
 from langchain.tools import tool
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.schema import BaseMessage, HumanMessage, AIMessage
 from langgraph.graph import StateGraph, END
 from pydantic import BaseModel, Field
-import google.generativeai as genai
+import numpy as np
+from fast_planner import FAST_PLANNER
+from float_index import FloatIndex, STAT_KEYS, limit_results, load_float_index, resolve_parameter_keys, to_epoch_day
+from plan_cache import PLAN_CACHE, PlanCache
 
 
 # Assume the DATA_STRUCTURE description is unchanged and available.
@@ -60,21 +63,84 @@ Float Data Structure:
 
 class AgentState(BaseModel):
     messages: List[BaseMessage] = []
+    tool_calls: List[Dict[str, Any]] = []
     float_ids: List[str] = []
     query_processed: bool = False
 
-# Load data from file
-with open("meta_data.json","r") as f:
-    FLOAT_DATA = json.load(f)
+# Metadata location; override with ARGO_META_DATA_PATH / ARGO_SNAPSHOT_PATH
+META_DATA_PATH = os.environ.get(
+    "ARGO_META_DATA_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "meta_data.json"),
+)
+SNAPSHOT_PATH = os.environ.get("ARGO_SNAPSHOT_PATH")
+
+# Both are loaded on first use, not at import
+FLOAT_DATA: Optional[Dict[str, Any]] = None
+FLOAT_INDEX: Optional[FloatIndex] = None
+_DATA_LOCK = threading.Lock()
+# mtime of the meta_data.json currently in memory; None when data was passed to load_float_data
+_LOADED_MTIME: Optional[float] = None
+# How often (at most) a query checks whether meta_data.json was replaced
+RELOAD_CHECK_SECONDS = float(os.environ.get("ARGO_META_RELOAD_SECONDS", "5"))
+_NEXT_RELOAD_CHECK = 0.0
+
+
+def _meta_data_mtime() -> Optional[float]:
+    try:
+        return os.path.getmtime(META_DATA_PATH)
+    except OSError:
+        return None
+
+
+def get_float_index() -> FloatIndex:
+    """Columnar view of the float metadata used by the filter tools."""
+    global FLOAT_INDEX, _LOADED_MTIME
+    if FLOAT_INDEX is None:
+        with _DATA_LOCK:
+            if FLOAT_INDEX is None:
+                _LOADED_MTIME = _meta_data_mtime()
+                FLOAT_INDEX = load_float_index(META_DATA_PATH, SNAPSHOT_PATH)
+                print(f"Loaded {FLOAT_INDEX.size} floats into memory")
+    return FLOAT_INDEX
 
 
 def load_float_data(data: Dict[str, Any]):
     """Load float data into the system"""
-    global FLOAT_DATA
-    FLOAT_DATA = data
+    global FLOAT_DATA, FLOAT_INDEX, _LOADED_MTIME
+    index = FloatIndex.from_float_data(data)
+    with _DATA_LOCK:
+        FLOAT_DATA = data
+        FLOAT_INDEX = index
+        _LOADED_MTIME = None
     print(f"Loaded {len(FLOAT_DATA)} floats into memory")
 
-# --- All tools remain unchanged ---
+
+def reload_if_changed(force: bool = False) -> bool:
+    """
+    Swap in a new meta_data.json (e.g. after refresh_status.py or make_json.py
+    replaced it) without restarting. The file's mtime is checked at most every
+    RELOAD_CHECK_SECONDS; nothing happens before the first load or when the
+    data came from load_float_data. Returns True when a new version was loaded.
+    """
+    global FLOAT_DATA, FLOAT_INDEX, _LOADED_MTIME, _NEXT_RELOAD_CHECK
+    # Sub-queries run on a thread pool: check and swap under the lock so only
+    # one thread reloads and none sees a half-updated data/index pair
+    with _DATA_LOCK:
+        now = time.monotonic()
+        if not force and now < _NEXT_RELOAD_CHECK:
+            return False
+        _NEXT_RELOAD_CHECK = now + RELOAD_CHECK_SECONDS
+        mtime = _meta_data_mtime()
+        if FLOAT_INDEX is None or _LOADED_MTIME is None or mtime is None or mtime == _LOADED_MTIME:
+            return False
+        # The snapshot no longer matches the JSON's mtime/size, so load_float_index rebuilds it
+        index = load_float_index(META_DATA_PATH, SNAPSHOT_PATH)
+        FLOAT_INDEX = index
+        FLOAT_DATA = None
+        _LOADED_MTIME = mtime
+    print(f"Reloaded {index.size} floats from {META_DATA_PATH}")
+    return True
+
 @tool
 def get_all_float_ids(float_ids:List) -> List[str]:
     """
@@ -88,7 +154,7 @@ def get_float_by_id(float_id: str) -> List[str]:
     Fetch a float directly by its float_id if it exists in the dataset.
     """
     fid = str(float_id)  # normalize to string
-    if fid in FLOAT_DATA:
+    if fid in get_float_index():
         return [fid]
     return []
 
@@ -108,23 +174,59 @@ def filter_by_coordinates(lat_min: float, lat_max: float, lon_min: float, lon_ma
         List of float IDs within the coordinate boundaries
     """
     print(f"Filtering by coordinates: lat({lat_min}, {lat_max}), lon({lon_min}, {lon_max})")
-    matching_floats = []
-    
-    for float_id, data in FLOAT_DATA.items():
-        launch_info = data.get('launch_info', {})
-        lat = launch_info.get('latitude')
-        lon = launch_info.get('longitude')
-        
-        if lat is not None and lon is not None:
-            if lat_min <= lat <= lat_max and lon_min <= lon <= lon_max:
-                matching_floats.append(float_id)
-    
+    index = get_float_index()
+    positions = index.spatial.box(lat_min, lat_max, lon_min, lon_max)
+    matching_floats = index.ids_for(positions)
     print(f"Found {len(matching_floats)} matching floats")
+    return limit_results(matching_floats, k)
+
+@tool
+def find_nearest_floats(latitude: float, longitude: float, k: Union[int, str] = 1) -> List[str]:
+    """
+    Find the floats whose launch position is closest to a point.
+    
+    Args:
+        latitude: Latitude of the point of interest
+        longitude: Longitude of the point of interest
+        k: Number of nearest floats to return ('all' or integer)
     
+    Returns:
+        List of float IDs ordered from nearest to farthest
+    """
+    print(f"Finding nearest floats to ({latitude}, {longitude}), k={k}")
     if k == "all":
-        return matching_floats
+        num_k = None
     else:
-        return matching_floats[:int(k)]
+        try:
+            num_k = int(k)
+        except (ValueError, TypeError):
+            num_k = 1
+    index = get_float_index()
+    positions, distances = index.spatial.nearest(float(latitude), float(longitude), k=num_k)
+    if len(distances):
+        print(f"Nearest float is {distances[0]:.1f} km away")
+    return index.ids_for(positions)
+
+@tool
+def filter_by_radius(latitude: float, longitude: float, radius_km: float, k: Union[int, str] = "all") -> List[str]:
+    """
+    Filter floats launched within a distance of a point.
+    
+    Args:
+        latitude: Latitude of the centre point
+        longitude: Longitude of the centre point
+        radius_km: Search radius in kilometres
+        k: Number of results to return ('all' or integer), nearest first
+    
+    Returns:
+        List of float IDs within the radius, ordered from nearest to farthest
+    """
+    print(f"Filtering by radius: {radius_km} km around ({latitude}, {longitude})")
+    index = get_float_index()
+    positions, _ = index.spatial.nearest(float(latitude), float(longitude), k=None, radius_km=float(radius_km))
+    matching_floats = index.ids_for(positions)
+    print(f"Found {len(matching_floats)} matching floats")
+    return limit_results(matching_floats, k)
 
 @tool
 def filter_by_date_range(start_date: str, end_date: str, k: Union[int, str] = "all") -> List[str]:
@@ -138,38 +240,17 @@ def filter_by_date_range(start_date: str, end_date: str, k: Union[int, str] = "a
         List of float IDs launched within the date range
     """
     print(f"Filtering by date range: {start_date} to {end_date}")
-    matching_floats = []
     try:
-        start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-        end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+        start_day = to_epoch_day(start_date)
+        end_day = to_epoch_day(end_date)
     except ValueError as e:
         print(f"Error parsing input date range: {e}")
         return []
 
-    for float_id, data in FLOAT_DATA.items():
-        launch_date_str = data.get('launch_info', {}).get('date')
-        if launch_date_str:
-            clean_date_str = launch_date_str
-            if isinstance(launch_date_str, str) and launch_date_str.startswith("b'") and launch_date_str.endswith("'"):
-                clean_date_str = launch_date_str[2:-1]
-
-            if len(clean_date_str) == 14 and clean_date_str.isdigit():
-                try:
-                    launch_dt = datetime.strptime(clean_date_str[:8], "%Y%m%d")
-                    if start_dt <= launch_dt <= end_dt:
-                        matching_floats.append(float_id)
-                except ValueError:
-                    continue
-            else:
-                continue
+    index = get_float_index()
+    matching_floats = index.ids_for(index.date_positions(start_day, end_day))
     print(f"Found {len(matching_floats)} matching floats")
-    if k == "all":
-        return matching_floats
-    else:
-        try:
-            return matching_floats[:int(k)]
-        except (ValueError, TypeError):
-            return matching_floats
+    return limit_results(matching_floats, k)
 
 # REFINED TOOL WITH MINOR BUG FIX
 @tool
@@ -190,45 +271,11 @@ def filter_by_parameter_value(parameter: str, operator: str, value: float, k: Un
     """
     print(f"Filtering by parameter: {parameter} {operator} {value}")
     
-    keys_to_check = []
-    if parameter.endswith(('_max', '_min', '_avg')):
-        keys_to_check.append(parameter)
-    else:
-        param_key_map = {'temperature': 'temp', 'psal': 'psal', 'pres': 'pres', 'doxy': 'doxy'}
-        base_key = param_key_map.get(parameter.lower())
-        
-        if not base_key:
-            keys_to_check.append(parameter)
-        else:
-            keys_to_check.extend([f"{base_key}_max", f"{base_key}_min", f"{base_key}_avg"])
-
-    matching_floats = []
-    
-    for float_id, data in FLOAT_DATA.items():
-        for key in keys_to_check:
-            param_value = data.get(key)
-            if param_value is not None and param_value != 0.0:
-                match = False
-                if operator == '>' and param_value > value: match = True
-                elif operator == '<' and param_value < value: match = True
-                elif operator == '>=' and param_value >= value: match = True
-                elif operator == '<=' and param_value <= value: match = True
-                elif (operator == '==' or operator == '=') and param_value == value: match = True
-                
-                if match:
-                    matching_floats.append(float_id)
-                    break 
-    
+    keys_to_check = resolve_parameter_keys(parameter)
+    index = get_float_index()
+    matching_floats = index.ids_for(index.parameter_mask(keys_to_check, operator, value))
     print(f"Found {len(matching_floats)} matching floats")
-    
-    if k == "all":
-        return matching_floats
-    else:
-        try:
-            num_k = int(k)
-            return matching_floats[:num_k]
-        except (ValueError, TypeError):
-            return matching_floats
+    return limit_results(matching_floats, k)
 
 
 @tool
@@ -237,7 +284,7 @@ def find_extreme_values(parameter: str, extreme_type: str, k: Union[int, str] =
     Find floats with extreme values (min/max) for a parameter.
     
     Args:
-        parameter: Parameter name (e.g., 'temperature', 'psal', 'pres')
+        parameter: Parameter name (e.g., 'temperature', 'psal', 'pres', 'doxy', 'chla', 'nitrate') or a specific field like 'temp_avg'
         extreme_type: 'min' or 'max'
         k: Number of results to return ('all' or integer)
     
@@ -245,34 +292,21 @@ def find_extreme_values(parameter: str, extreme_type: str, k: Union[int, str] =
         List of float IDs with extreme values
     """
     print(f"Finding extreme values: {parameter} {extreme_type}")
-    param_key_map = {'temperature': 'temp', 'psal': 'psal', 'pres': 'pres', 'doxy': 'doxy'}
-    base_key = param_key_map.get(parameter.lower())
-    if not base_key:
+    param_keys_to_check = [key for key in resolve_parameter_keys(parameter) if key in STAT_KEYS]
+    if not param_keys_to_check:
         print(f"Error: Unknown parameter '{parameter}'")
         return []
-    
-    param_keys_to_check = [f"{base_key}_max", f"{base_key}_min", f"{base_key}_avg"]
-    
-    float_values = []
-    for float_id, data in FLOAT_DATA.items():
-        candidate_values = [data.get(key) for key in param_keys_to_check if data.get(key) is not None and data.get(key) != 0.0]
-        if not candidate_values:
-            continue
 
-        extreme_value_for_float = max(candidate_values) if extreme_type == 'max' else min(candidate_values)
-        float_values.append((float_id, extreme_value_for_float))
-
-    if not float_values: return []
-    
-    if extreme_type == 'min': float_values.sort(key=lambda x: x[1])
-    else: float_values.sort(key=lambda x: x[1], reverse=True)
-    
-    result_floats = [float_id for float_id, _ in float_values]
-    
-    if k == "all": return result_floats
+    if k == "all":
+        num_k = None
     else:
-        try: return result_floats[:int(k)]
-        except (ValueError, TypeError): return result_floats
+        try:
+            num_k = int(k)
+        except (ValueError, TypeError):
+            num_k = None
+    index = get_float_index()
+    ranked = index.top_k(param_keys_to_check, extreme_type, num_k)
+    return index.ids_for(ranked)
 
 @tool
 def filter_by_platform_type(platform_type: str, k: Union[int, str] = "all") -> List[str]:
@@ -287,17 +321,10 @@ def filter_by_platform_type(platform_type: str, k: Union[int, str] = "all") -> L
         List of float IDs with specified platform type
     """
     print(f"Filtering by platform type: {platform_type}")
-    matching_floats = []
-    
-    for float_id, data in FLOAT_DATA.items():
-        float_platform_type = data.get('launch_info', {}).get('platform_type', '')
-        if platform_type.upper() in float_platform_type.upper():
-            matching_floats.append(float_id)
-    
+    index = get_float_index()
+    matching_floats = index.ids_for(index.platform_mask(platform_type))
     print(f"Found {len(matching_floats)} matching floats")
-    
-    if k == "all": return matching_floats
-    else: return matching_floats[:int(k)]
+    return limit_results(matching_floats, k)
 @tool
 def filter_by_negation(filter_type: str, k: Union[int, str] = "all", **kwargs) -> List[str]:
     """
@@ -313,35 +340,22 @@ def filter_by_negation(filter_type: str, k: Union[int, str] = "all", **kwargs) -
         A list of float IDs that DO NOT match the specified criteria.
     """
     print(f"Executing negation filter for type '{filter_type}' with params {kwargs}")
-    
-    all_float_ids = set(get_all_float_ids.func())
-    
     inner_k = kwargs.pop('k', 'all')
-    
-    floats_to_exclude = []
-    # *** THIS IS THE CORRECTED LOGIC ***
-    # We check for the keyword 'in' the filter_type string to make it more robust.
-    if 'coordinates' in filter_type:
-        floats_to_exclude = filter_by_coordinates.func(k=inner_k, **kwargs)
-    elif 'date_range' in filter_type:
-        floats_to_exclude = filter_by_date_range.func(k=inner_k, **kwargs)
-    elif 'platform_type' in filter_type:
-        floats_to_exclude = filter_by_platform_type.func(k=inner_k, **kwargs)
-    else:
+    index = get_float_index()
+
+    try:
+        exclude_mask = _negation_mask(filter_type, inner_k, index, **kwargs)
+    except ValueError as e:
+        print(f"Error building negation filter: {e}")
+        return []
+    if exclude_mask is None:
         # Improved error message for better debugging
         return [f"Error: Invalid filter_type '{filter_type}' for negation."]
-        
-    final_float_ids = list(all_float_ids - set(floats_to_exclude))
+
+    final_float_ids = index.ids_for(~exclude_mask)
     print(f"Result of negation: {len(final_float_ids)} floats")
+    return limit_results(final_float_ids, k)
 
-    if k == "all":
-        return final_float_ids
-    else:
-        try:
-            num_k = int(k)
-            return final_float_ids[:num_k]
-        except (ValueError, TypeError):
-            return final_float_ids
 @tool
 def combine_filters(float_lists: List[List[str]]) -> List[str]:
     """
@@ -354,14 +368,66 @@ def combine_filters(float_lists: List[List[str]]) -> List[str]:
         List of float IDs present in all input lists
     """
     if not float_lists: return []
-    result = set(float_lists[0])
-    for float_list in float_lists[1:]:
-        result.intersection_update(set(float_list))
-    return list(result)
+    index = get_float_index()
+    masks = [index.mask_for_ids(float_list) for float_list in float_lists]
+    return index.ids_for(np.logical_and.reduce(masks))
+
+# --- Bitmap versions of the filters ---
+# Each returns a boolean mask over FLOAT_INDEX positions, so AND/NOT across
+# several conditions are bitwise operations and IDs are only built at the end.
+FILTER_MASKS = {
+    'filter_by_coordinates': lambda index, lat_min, lat_max, lon_min, lon_max: index.coordinate_mask(lat_min, lat_max, lon_min, lon_max),
+    'filter_by_date_range': lambda index, start_date, end_date: index.date_mask(to_epoch_day(start_date), to_epoch_day(end_date)),
+    'filter_by_parameter_value': lambda index, parameter, operator, value: index.parameter_mask(resolve_parameter_keys(parameter), operator, value),
+    'filter_by_platform_type': lambda index, platform_type: index.platform_mask(platform_type),
+}
+
+
+def _negation_mask(filter_type: str, inner_k: Union[int, str] = "all", index: Optional[FloatIndex] = None,
+                   **kwargs) -> Optional[np.ndarray]:
+    """Mask of the floats a negation should exclude, or None for an unknown filter_type."""
+    if index is None:
+        index = get_float_index()
+    # We check for the keyword 'in' the filter_type string to make it more robust.
+    if 'coordinates' in filter_type:
+        mask = FILTER_MASKS['filter_by_coordinates'](index, **kwargs)
+    elif 'date_range' in filter_type:
+        mask = FILTER_MASKS['filter_by_date_range'](index, **kwargs)
+    elif 'platform_type' in filter_type:
+        mask = FILTER_MASKS['filter_by_platform_type'](index, **kwargs)
+    else:
+        return None
+    if inner_k != "all":
+        mask = index.mask_for_positions(limit_results(np.flatnonzero(mask), inner_k))
+    return mask
+
+
+def filter_mask(tool_name: str, parameters: Dict[str, Any], index: Optional[FloatIndex] = None) -> Optional[np.ndarray]:
+    """
+    Bitmap for a parsed tool call over index (the current one by default), or
+    None when the call has no bitmap form (ranking tools, a k limit, unknown
+    tools or unparseable arguments).
+    """
+    if index is None:
+        index = get_float_index()
+    parameters = dict(parameters)
+    if parameters.pop('k', 'all') != "all":
+        return None
+    try:
+        if tool_name == 'filter_by_negation':
+            filter_type = parameters.pop('filter_type', '')
+            exclude_mask = _negation_mask(filter_type, index=index, **parameters)
+            return None if exclude_mask is None else ~exclude_mask
+        mask_func = FILTER_MASKS.get(tool_name)
+        return mask_func(index, **parameters) if mask_func else None
+    except (TypeError, ValueError):
+        return None
 
 # Tool list
 tools = [
     filter_by_coordinates,
+    find_nearest_floats,
+    filter_by_radius,
     filter_by_date_range,
     filter_by_parameter_value,
     find_extreme_values,
@@ -381,8 +447,16 @@ class QueryDecomposition(BaseModel):
     """A list of sub-queries decomposed from the user's original request."""
     sub_queries: List[SubQuery]
 
+# Upper bound on sub-queries executed at the same time by ArgoFloatAgent.query;
+# override with ARGO_FILTER_CONCURRENCY
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("ARGO_FILTER_CONCURRENCY", "4"))
+
 class ArgoFloatAgent:
-    def __init__(self, google_api_key: str):
+    def __init__(self, google_api_key: str, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, use_fast_path: bool = True,
+                 plan_cache: Optional[PlanCache] = PLAN_CACHE):
+        self.max_concurrency = max(1, max_concurrency)
+        self.planner = FAST_PLANNER if use_fast_path else None
+        self.plan_cache = plan_cache
         self.llm = ChatGoogleGenerativeAI(
             model="gemini-1.5-flash",
             google_api_key=google_api_key,
@@ -400,13 +474,32 @@ class ArgoFloatAgent:
     # *** UPDATED COMPREHENSIVE PROMPT ***
     def agent_node(self, state: AgentState) -> AgentState:
         """Agent node that processes a user sub-query and determines tools to call"""
-        
+        user_query = state.messages[-1].content if state.messages else ""
+
+        # Common query shapes are planned by rules, skipping the LLM round trip
+        if self.planner:
+            planned_calls = self.planner.plan(user_query)
+            if planned_calls is not None:
+                print(f"Fast path tool calls: {planned_calls} (planner stats: {self.planner.stats()})")
+                state.tool_calls = planned_calls
+                return state
+
+        # Reuse the plan the LLM produced for the same sub-query earlier
+        if self.plan_cache is not None:
+            cached_calls = self.plan_cache.get(user_query)
+            if cached_calls is not None:
+                print(f"Cached tool calls: {cached_calls} (plan cache stats: {self.plan_cache.stats()})")
+                state.tool_calls = cached_calls
+                return state
+
         system_prompt = f"""
         You are an Argo Float Filter Agent. Your job is to analyze a user query and determine which tools to call.
         You will be given a single, focused query. Convert it into the appropriate tool calls.
 
         Available tools:
         - filter_by_coordinates(lat_min, lat_max, lon_min, lon_max, k)
+        - find_nearest_floats(latitude, longitude, k)
+        - filter_by_radius(latitude, longitude, radius_km, k)
         - filter_by_date_range(start_date, end_date, k)
         - filter_by_parameter_value(parameter, operator, value, k)
         - find_extreme_values(parameter, extreme_type, k)
@@ -419,6 +512,9 @@ class ArgoFloatAgent:
         - Arabian Sea: lat_min=8, lat_max=25, lon_min=50, lon_max=75
         - Indian Ocean: lat_min=-30, lat_max=30, lon_min=30, lon_max=120
         - When user asked about the data that is not here you only figure out a boundary take a large region only not so small of that place and find nearest float to that region.
+        - For "nearest"/"closest" float questions, use `find_nearest_floats` with the point's latitude and longitude.
+        - For "within N km of" questions, use `filter_by_radius`.
+        - A box that crosses the 180° meridian is written with lon_min > lon_max (e.g. lon_min=170, lon_max=-170).
         - If a query only specifies latitude, assume the full longitude range (-180 to 180).
         - If a query only specifies longitude, assume the full latitude range (-90 to 90).
 
@@ -455,26 +551,44 @@ class ArgoFloatAgent:
         - 'shallowest' or 'minimum pressure' means `parameter='pres', extreme_type='min'`.
         - 'hottest' or 'most temperature' means `parameter='temperature', extreme_type='max'`.
         - 'coldest' or 'least temperature' means `parameter='temperature', extreme_type='min'`.
+        - Other parameters: 'psal', 'doxy', 'chla', 'bbp700', 'nitrate', 'ph', 'turbidity', 'cdom'.
 
         For the user query, determine the appropriate tool calls and respond with ONLY the tool calls in the format:
         TOOL_CALLS:
         [tool_name]: [parameters as comma-separated key=value pairs]
         """
         
-        user_query = state.messages[-1].content if state.messages else ""
         prompt = f"{system_prompt}\n\nUser Query: {user_query}\n\nAnalyze the query and provide tool calls:"
         response = self.llm.invoke([HumanMessage(content=prompt)])
         print(f"LLM Response for tool calls: {response.content}")
         state.messages.append(response)
+        state.tool_calls = self._parse_tool_calls(response.content)
+        if state.tool_calls and self.plan_cache is not None:
+            self.plan_cache.put(user_query, state.tool_calls)
         return state
     
     def action_node(self, state: AgentState) -> AgentState:
         """Execute the tools determined by the agent"""
         last_message = state.messages[-1].content
         try:
-            tool_calls = self._parse_tool_calls(last_message)
+            if state.tool_calls:
+                tool_calls = state.tool_calls
+            else:
+                tool_calls = self._parse_tool_calls(last_message)
             print(f"Parsed tool calls: {tool_calls}")
             
+            tool_calls = [call for call in tool_calls if call['tool_name'] != 'combine_filters']
+            # One index for every mask and the final lookup, so a hot reload
+            # mid-query cannot mix positions from two versions of the metadata
+            index = get_float_index()
+            masks = [filter_mask(call['tool_name'], call['parameters'], index) for call in tool_calls]
+            if masks and all(mask is not None for mask in masks):
+                # Every condition has a bitmap form: AND them and build the ID list once
+                print(f"Combining {len(masks)} filter bitmaps...")
+                state.float_ids = index.ids_for(np.logical_and.reduce(masks))
+                state.query_processed = True
+                return state
+
             results = []
             for tool_call in tool_calls:
                 tool_name = tool_call['tool_name']
@@ -600,14 +714,48 @@ class ArgoFloatAgent:
         User Query: "{user_input}"
         """
 
+        reload_if_changed()
         print(f"--- Decomposing Query: {user_input} ---")
         decomposed_result = self.structured_llm.invoke(decomposition_prompt)
         
-        final_results = {}
+        sub_queries = decomposed_result.sub_queries
 
-        for sub_q in decomposed_result.sub_queries:
+        def run_sub_query(sub_q: SubQuery) -> List[str]:
             print(f"\n--- Executing Sub-Query '{sub_q.label}': {sub_q.query} ---")
             float_ids = self._execute_sub_query(sub_q.query)
-            final_results[sub_q.label] = float_ids
             print(f"--- Finished Sub-Query '{sub_q.label}', Found {len(float_ids)} floats ---")
+            return float_ids
+
+        # Each sub-query is an independent LLM round trip, so run them side by side
+        workers = min(self.max_concurrency, len(sub_queries))
+        if workers <= 1:
+            sub_results = [run_sub_query(sub_q) for sub_q in sub_queries]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                sub_results = list(executor.map(run_sub_query, sub_queries))
+
+        # Results keep the decomposition order of the labels
+        final_results = {}
+        for sub_q, float_ids in zip(sub_queries, sub_results):
+            final_results[sub_q.label] = float_ids
         return final_results
+
+
+# --- Process-wide agent registry ---
+# Building an agent creates a Gemini client, a structured-output wrapper and a
+# compiled graph; all of them are safe to share, so each key gets one agent.
+_AGENT_REGISTRY: Dict[tuple, ArgoFloatAgent] = {}
+_AGENT_REGISTRY_LOCK = threading.Lock()
+
+
+def get_argo_agent(google_api_key: str, max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> ArgoFloatAgent:
+    """Return the shared ArgoFloatAgent for this API key, building it on first use."""
+    key = (google_api_key, max_concurrency)
+    agent = _AGENT_REGISTRY.get(key)
+    if agent is None:
+        with _AGENT_REGISTRY_LOCK:
+            agent = _AGENT_REGISTRY.get(key)
+            if agent is None:
+                agent = ArgoFloatAgent(google_api_key, max_concurrency=max_concurrency)
+                _AGENT_REGISTRY[key] = agent
+    return agent
@@ -0,0 +1,539 @@
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Union
+
+import numpy as np
+
+
+# Summary statistic families stored per float in meta_data.json
+PARAMETER_FAMILIES = [
+    'temp', 'psal', 'pres', 'doxy', 'fluorescence_chla',
+    'bbp700', 'nitrate', 'ph', 'turbidity', 'cdom',
+]
+STAT_SUFFIXES = ['max', 'min', 'avg']
+STAT_KEYS = [f"{family}_{suffix}" for family in PARAMETER_FAMILIES for suffix in STAT_SUFFIXES]
+
+# General parameter names the LLM may use, mapped to their stat family
+PARAMETER_ALIASES = {
+    'temperature': 'temp', 'temp': 'temp',
+    'salinity': 'psal', 'psal': 'psal',
+    'pressure': 'pres', 'pres': 'pres', 'depth': 'pres',
+    'oxygen': 'doxy', 'dissolved_oxygen': 'doxy', 'doxy': 'doxy',
+    'chlorophyll': 'fluorescence_chla', 'chla': 'fluorescence_chla', 'fluorescence_chla': 'fluorescence_chla',
+    'backscatter': 'bbp700', 'bbp700': 'bbp700',
+    'nitrate': 'nitrate',
+    'ph': 'ph',
+    'turbidity': 'turbidity',
+    'cdom': 'cdom',
+}
+
+# Sentinel for floats whose launch date could not be parsed
+MISSING_DAY = np.iinfo(np.int64).min
+EPOCH = datetime(1970, 1, 1)
+
+SNAPSHOT_FORMAT = 1
+
+EARTH_RADIUS_KM = 6371.0
+GRID_CELL_DEGREES = 2.0
+
+
+def clean_byte_string(value: Any) -> str:
+    """Strip the b'...' wrapper the metadata builder leaves around NetCDF strings."""
+    if not isinstance(value, str):
+        return ""
+    if value.startswith("b'") and value.endswith("'"):
+        return value[2:-1]
+    return value
+
+
+def parse_launch_day(launch_date: Any) -> Optional[int]:
+    """
+    Convert a raw launch date ("b'YYYYMMDDHHMMSS'") into days since 1970-01-01.
+    Returns None when the value is missing or malformed.
+    """
+    clean_date_str = clean_byte_string(launch_date)
+    if len(clean_date_str) != 14 or not clean_date_str.isdigit():
+        return None
+    try:
+        launch_dt = datetime.strptime(clean_date_str[:8], "%Y%m%d")
+    except ValueError:
+        return None
+    return (launch_dt - EPOCH).days
+
+
+def resolve_parameter_keys(parameter: str) -> List[str]:
+    """
+    Stat columns for a parameter name. Specific names ('temp_min') map to
+    themselves, general names ('temperature') to the family's max/min/avg.
+    Unknown names are returned unchanged so they simply match nothing.
+    """
+    if parameter.endswith(('_max', '_min', '_avg')):
+        return [parameter]
+    family = PARAMETER_ALIASES.get(parameter.lower().strip().replace(' ', '_'))
+    if not family:
+        return [parameter]
+    return [f"{family}_{suffix}" for suffix in STAT_SUFFIXES]
+
+
+def to_epoch_day(date_str: str) -> int:
+    """Convert a YYYY-MM-DD string into days since 1970-01-01 (raises ValueError)."""
+    return (datetime.strptime(date_str, "%Y-%m-%d") - EPOCH).days
+
+
+def normalize_longitude(lon: float) -> float:
+    """Map longitudes given as 0..360 (or beyond) onto -180..180."""
+    lon = float(lon)
+    if -180.0 <= lon <= 180.0:
+        return lon
+    return ((lon + 180.0) % 360.0) - 180.0
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km from one point to arrays of points."""
+    phi1, phi2 = np.radians(lat), np.radians(lats)
+    dphi = phi2 - phi1
+    dlmb = np.radians(lons - lon)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class SpatialGrid:
+    """
+    Fixed lat/lon grid over float positions.
+
+    Positions are bucketed into GRID_CELL_DEGREES cells and stored sorted by cell
+    (row-major), so every grid row of a query window is one contiguous slice.
+    Box queries only touch the cells they overlap; nearest-neighbour queries grow
+    a window ring by ring until no float outside it can be closer.
+    """
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, cell_degrees: float = GRID_CELL_DEGREES):
+        self.cell = cell_degrees
+        self.n_rows = int(np.ceil(180.0 / cell_degrees))
+        self.n_cols = int(np.ceil(360.0 / cell_degrees))
+        self.lat = lat
+        self.lon = lon
+
+        valid = np.flatnonzero(~np.isnan(lat) & ~np.isnan(lon))
+        cell_ids = self._rows(lat[valid]) * self.n_cols + self._cols(lon[valid])
+        order = np.argsort(cell_ids, kind='stable')
+        self.positions = valid[order]
+        counts = np.bincount(cell_ids[order], minlength=self.n_rows * self.n_cols)
+        self.cell_start = np.concatenate(([0], np.cumsum(counts)))
+
+    def _rows(self, lat):
+        return np.clip(((np.asarray(lat) + 90.0) // self.cell).astype(np.int64), 0, self.n_rows - 1)
+
+    def _cols(self, lon):
+        return np.clip(((np.asarray(lon) + 180.0) // self.cell).astype(np.int64), 0, self.n_cols - 1)
+
+    def _col_spans(self, col_a: int, col_b: int) -> List[tuple]:
+        """Split an inclusive, possibly wrapping, column range into plain spans."""
+        if col_b - col_a + 1 >= self.n_cols:
+            return [(0, self.n_cols - 1)]
+        col_a %= self.n_cols
+        col_b %= self.n_cols
+        if col_a <= col_b:
+            return [(col_a, col_b)]
+        return [(col_a, self.n_cols - 1), (0, col_b)]
+
+    def _window(self, row_a: int, row_b: int, col_spans: List[tuple]) -> np.ndarray:
+        slices = []
+        for row in range(max(row_a, 0), min(row_b, self.n_rows - 1) + 1):
+            base = row * self.n_cols
+            for col_a, col_b in col_spans:
+                start, stop = self.cell_start[base + col_a], self.cell_start[base + col_b + 1]
+                if stop > start:
+                    slices.append(self.positions[start:stop])
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+
+    def box(self, lat_min: float, lat_max: float, lon_min: float, lon_max: float) -> np.ndarray:
+        """
+        Positions inside a lat/lon box, in ascending order. A box whose lon_min is
+        east of lon_max is treated as crossing the antimeridian; a span of 360° or
+        more (e.g. 0..360) covers every longitude.
+        """
+        if float(lon_max) - float(lon_min) >= 360.0:
+            lon_min, lon_max = -180.0, 180.0
+        else:
+            lon_min, lon_max = normalize_longitude(lon_min), normalize_longitude(lon_max)
+        if lat_min > lat_max:
+            return np.empty(0, dtype=np.int64)
+        row_a, row_b = int(self._rows(max(lat_min, -90.0))), int(self._rows(min(lat_max, 90.0)))
+        col_a, col_b = int(self._cols(lon_min)), int(self._cols(lon_max))
+        wraps = lon_min > lon_max
+        if wraps:
+            col_b += self.n_cols
+        candidates = self._window(row_a, row_b, self._col_spans(col_a, col_b))
+
+        lats, lons = self.lat[candidates], self.lon[candidates]
+        inside = (lats >= lat_min) & (lats <= lat_max)
+        if wraps:
+            inside &= (lons >= lon_min) | (lons <= lon_max)
+        else:
+            inside &= (lons >= lon_min) & (lons <= lon_max)
+        return np.sort(candidates[inside])
+
+    def _outside_bound_km(self, lat: float, lon: float, row_a: int, row_b: int, col_a: int, col_b: int) -> float:
+        """Lower bound on the distance from (lat, lon) to any float outside the window."""
+        bound = np.inf
+        if row_a > 0:
+            bound = min(bound, lat - (row_a * self.cell - 90.0))
+        if row_b < self.n_rows - 1:
+            bound = min(bound, (row_b + 1) * self.cell - 90.0 - lat)
+        if col_b - col_a + 1 < self.n_cols:
+            dlon = min(lon - (col_a * self.cell - 180.0), (col_b + 1) * self.cell - 180.0 - lon)
+            # Distance to the nearest meridian outside the window
+            lon_bound = np.degrees(np.arcsin(np.cos(np.radians(lat)) * np.sin(np.radians(min(dlon, 90.0)))))
+            bound = min(bound, lon_bound)
+        return np.radians(max(bound, 0.0)) * EARTH_RADIUS_KM
+
+    def nearest(self, lat: float, lon: float, k: Optional[int] = 1, radius_km: Optional[float] = None):
+        """
+        Up to k positions closest to (lat, lon), optionally limited to radius_km,
+        ordered by distance. Returns (positions, distances_km).
+        """
+        lon = normalize_longitude(lon)
+        if len(self.positions) == 0 or (k is not None and k <= 0):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        row0, col0 = int(self._rows(lat)), int(self._cols(lon))
+        max_ring = max(self.n_rows, self.n_cols // 2)
+
+        ring = 0
+        while True:
+            row_a, row_b = row0 - ring, row0 + ring
+            col_a, col_b = col0 - ring, col0 + ring
+            candidates = self._window(row_a, row_b, self._col_spans(col_a, col_b))
+            distances = haversine_km(lat, lon, self.lat[candidates], self.lon[candidates])
+            if radius_km is not None:
+                keep = distances <= radius_km
+                candidates, distances = candidates[keep], distances[keep]
+
+            bound = self._outside_bound_km(lat, lon, max(row_a, 0), min(row_b, self.n_rows - 1), col_a, col_b)
+            if k is not None and len(candidates) >= k:
+                kth = np.partition(distances, k - 1)[k - 1]
+                done = kth <= bound
+            else:
+                done = radius_km is not None and radius_km <= bound
+            if done or ring >= max_ring:
+                break
+            ring += 1
+
+        order = np.lexsort((candidates, distances))
+        if k is not None:
+            order = order[:k]
+        return candidates[order], distances[order]
+
+
+class FloatIndex:
+    """
+    Columnar, read-only view over FLOAT_DATA.
+
+    Every float gets a fixed position; each attribute the filter tools look at is
+    stored as a NumPy column in that order, so a filter is a vectorized mask over
+    the columns instead of a walk over the nested dicts.
+    """
+
+    def __init__(self, ids: np.ndarray, lat: np.ndarray, lon: np.ndarray, launch_day: np.ndarray,
+                 cycles: np.ndarray, stats: Dict[str, np.ndarray], platform_types: np.ndarray,
+                 platform_code: np.ndarray, statuses: np.ndarray, status_code: np.ndarray):
+        self._id_array = ids
+        self.size = len(ids)
+        self.lat = lat
+        self.lon = lon
+        self.launch_day = launch_day
+        self.cycles = cycles
+        self.stats = stats
+        # Low-cardinality strings are stored as category codes
+        self.platform_types, self.platform_code = platform_types, platform_code
+        self.statuses, self.status_code = statuses, status_code
+
+        # Derived structures are built on first use
+        self._position: Optional[Dict[str, int]] = None
+        self._spatial: Optional[SpatialGrid] = None
+        self._date_order: Optional[np.ndarray] = None
+        self._sorted_days: Optional[np.ndarray] = None
+        self._rankings: Dict[tuple, np.ndarray] = {}
+
+        self.undated_ids = self.ids_for(self.launch_day == MISSING_DAY)
+        if self.undated_ids:
+            preview = ", ".join(self.undated_ids[:10])
+            more = f" (+{len(self.undated_ids) - 10} more)" if len(self.undated_ids) > 10 else ""
+            print(f"Warning: {len(self.undated_ids)} floats have no parseable launch date and are excluded from date filters: {preview}{more}")
+
+    @classmethod
+    def from_float_data(cls, float_data: Dict[str, Any]) -> "FloatIndex":
+        """Build the columns from the nested meta_data.json structure."""
+        ids = list(float_data.keys())
+        size = len(ids)
+        lat = np.full(size, np.nan)
+        lon = np.full(size, np.nan)
+        launch_day = np.full(size, MISSING_DAY, dtype=np.int64)
+        cycles = np.zeros(size, dtype=np.int64)
+        stats = {key: np.full(size, np.nan) for key in STAT_KEYS}
+
+        platform_types: List[str] = []
+        statuses: List[str] = []
+        for i, data in enumerate(float_data.values()):
+            launch_info = data.get('launch_info') or {}
+            float_lat = launch_info.get('latitude')
+            float_lon = launch_info.get('longitude')
+            if float_lat is not None and float_lon is not None:
+                lat[i] = float_lat
+                lon[i] = float_lon
+
+            day = parse_launch_day(launch_info.get('date'))
+            if day is not None:
+                launch_day[i] = day
+
+            for key, column in stats.items():
+                value = data.get(key)
+                if value is not None:
+                    column[i] = value
+
+            cycles[i] = data.get('cycles') or data.get('cycle') or 0
+            platform_types.append((launch_info.get('platform_type') or '').upper())
+            statuses.append(data.get('status') or '')
+
+        platform_names, platform_code = np.unique(np.array(platform_types, dtype=str), return_inverse=True)
+        status_names, status_code = np.unique(np.array(statuses, dtype=str), return_inverse=True)
+        return cls(np.array(ids, dtype=str), lat, lon, launch_day, cycles, stats,
+                   platform_names, platform_code, status_names, status_code)
+
+    # --- Binary snapshot ---
+    def save_snapshot(self, path: str, source_mtime: Optional[float] = None, source_size: Optional[int] = None):
+        """
+        Write the columns as .npy files plus a manifest into a directory. The
+        directory is swapped into place at the end, so readers never see a
+        half-written snapshot.
+        """
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        os.makedirs(tmp_path, exist_ok=True)
+        columns = {
+            'ids': self._id_array, 'lat': self.lat, 'lon': self.lon,
+            'launch_day': self.launch_day, 'cycles': self.cycles,
+            'stats': np.vstack([self.stats[key] for key in STAT_KEYS]) if self.size else np.empty((len(STAT_KEYS), 0)),
+            'platform_types': self.platform_types, 'platform_code': self.platform_code,
+            'statuses': self.statuses, 'status_code': self.status_code,
+        }
+        for name, column in columns.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(column))
+        manifest = {
+            'format': SNAPSHOT_FORMAT,
+            'count': self.size,
+            'stat_keys': STAT_KEYS,
+            'source_mtime': source_mtime,
+            'source_size': source_size,
+        }
+        with open(os.path.join(tmp_path, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+
+        old_path = f"{path}.old-{os.getpid()}"
+        if os.path.exists(path):
+            os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    @classmethod
+    def load_snapshot(cls, path: str) -> "FloatIndex":
+        """Memory-map a snapshot written by save_snapshot."""
+        with open(os.path.join(path, "manifest.json")) as f:
+            manifest = json.load(f)
+
+        def column(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+
+        stats_matrix = column('stats')
+        stats = {key: stats_matrix[j] for j, key in enumerate(manifest['stat_keys'])}
+        for key in STAT_KEYS:
+            stats.setdefault(key, np.full(manifest['count'], np.nan))
+        return cls(column('ids'), column('lat'), column('lon'), column('launch_day'), column('cycles'), stats,
+                   column('platform_types'), column('platform_code'), column('statuses'), column('status_code'))
+
+    # --- Lazily derived structures ---
+    @property
+    def position(self) -> Dict[str, int]:
+        if self._position is None:
+            self._position = {fid: i for i, fid in enumerate(self._id_array.tolist())}
+        return self._position
+
+    @property
+    def spatial(self) -> "SpatialGrid":
+        if self._spatial is None:
+            self._spatial = SpatialGrid(self.lat, self.lon)
+        return self._spatial
+
+    def _sorted_dates(self):
+        """Dated positions ordered by launch day, and the matching days."""
+        if self._date_order is None:
+            # Launch days sorted once so date ranges are two binary searches
+            dated = np.flatnonzero(self.launch_day != MISSING_DAY)
+            order = dated[np.argsort(self.launch_day[dated], kind='stable')]
+            self._sorted_days = self.launch_day[order]
+            self._date_order = order
+        return self._date_order, self._sorted_days
+
+    # --- Masks ---
+    def empty_mask(self) -> np.ndarray:
+        return np.zeros(self.size, dtype=bool)
+
+    def mask_for_positions(self, positions: np.ndarray) -> np.ndarray:
+        mask = self.empty_mask()
+        mask[positions] = True
+        return mask
+
+    def mask_for_ids(self, float_ids: List[str]) -> np.ndarray:
+        """Bitmap of the given float IDs; IDs not in the index are ignored."""
+        positions = [self.position[fid] for fid in map(str, float_ids) if fid in self.position]
+        return self.mask_for_positions(np.array(positions, dtype=np.int64))
+
+    def coordinate_mask(self, lat_min: float, lat_max: float, lon_min: float, lon_max: float) -> np.ndarray:
+        return self.mask_for_positions(self.spatial.box(lat_min, lat_max, lon_min, lon_max))
+
+    def date_positions(self, start_day: int, end_day: int) -> np.ndarray:
+        """Positions of floats launched between start_day and end_day (inclusive), in ascending order."""
+        date_order, sorted_days = self._sorted_dates()
+        lo = np.searchsorted(sorted_days, start_day, side='left')
+        hi = np.searchsorted(sorted_days, end_day, side='right')
+        return np.sort(date_order[lo:hi])
+
+    def date_mask(self, start_day: int, end_day: int) -> np.ndarray:
+        return self.mask_for_positions(self.date_positions(start_day, end_day))
+
+    def parameter_mask(self, keys: List[str], operator: str, value: float) -> np.ndarray:
+        """Match if ANY of the given stat columns satisfies the comparison (0.0 counts as missing)."""
+        mask = self.empty_mask()
+        for key in keys:
+            column = self.stats.get(key)
+            if column is None:
+                continue
+            if operator == '>': match = column > value
+            elif operator == '<': match = column < value
+            elif operator == '>=': match = column >= value
+            elif operator == '<=': match = column <= value
+            elif operator in ('==', '='): match = column == value
+            else: continue
+            mask |= match & (column != 0.0)
+        return mask
+
+    def platform_mask(self, platform_type: str) -> np.ndarray:
+        needle = platform_type.upper()
+        matching_codes = [code for code, name in enumerate(self.platform_types) if needle in name]
+        return np.isin(self.platform_code, matching_codes)
+
+    def status_mask(self, status: str) -> np.ndarray:
+        matching_codes = [code for code, name in enumerate(self.statuses) if name.lower() == status.lower()]
+        return np.isin(self.status_code, matching_codes)
+
+    # --- Rankings ---
+    def top_k(self, keys: List[str], extreme_type: str, k: Optional[int] = None) -> np.ndarray:
+        """
+        The k most extreme positions for the given stat columns. The full ordering
+        is computed once per (columns, direction) and cached, so later calls are a slice.
+        """
+        cache_key = (tuple(keys), extreme_type)
+        ranking = self._rankings.get(cache_key)
+        if ranking is None:
+            ranking = self.extreme_order(keys, extreme_type)
+            self._rankings[cache_key] = ranking
+        return ranking if k is None else ranking[:k]
+
+    def extreme_order(self, keys: List[str], extreme_type: str) -> np.ndarray:
+        """
+        Positions of floats ordered by their most extreme value over the given stat
+        columns. Floats without any usable value are left out.
+        """
+        columns = [self.stats[key] for key in keys if key in self.stats]
+        if not columns:
+            return np.empty(0, dtype=np.int64)
+        stacked = np.column_stack(columns)
+        stacked = np.where(stacked == 0.0, np.nan, stacked)
+        if extreme_type == 'max':
+            values = np.fmax.reduce(stacked, axis=1)
+        else:
+            values = np.fmin.reduce(stacked, axis=1)
+        valid = np.flatnonzero(~np.isnan(values))
+        ranked = values[valid] if extreme_type == 'min' else -values[valid]
+        return valid[np.argsort(ranked, kind='stable')]
+
+    # --- Conversion back to float IDs ---
+    def ids_for(self, selection: np.ndarray) -> List[str]:
+        """Return float IDs for a boolean mask or an array of positions, keeping their order."""
+        return self._id_array[selection].tolist()
+
+    def __contains__(self, float_id: str) -> bool:
+        return str(float_id) in self.position
+
+
+def snapshot_is_fresh(snapshot_path: str, json_path: str) -> bool:
+    """
+    True when the snapshot exists, has the current format and was built from
+    exactly this JSON file (same mtime and size). An older file restored in
+    place of the JSON does not count as fresh.
+    """
+    try:
+        with open(os.path.join(snapshot_path, "manifest.json")) as f:
+            manifest = json.load(f)
+        st = os.stat(json_path)
+    except (OSError, ValueError):
+        return False
+    if manifest.get('format') != SNAPSHOT_FORMAT or manifest.get('stat_keys') != STAT_KEYS:
+        return False
+    return manifest.get('source_mtime') == st.st_mtime and manifest.get('source_size') == st.st_size
+
+
+def build_snapshot(json_path: str, snapshot_path: str) -> FloatIndex:
+    """Parse meta_data.json once and write its binary snapshot."""
+    # Stat before reading: if the file is replaced meanwhile, the next check rebuilds
+    st = os.stat(json_path)
+    with open(json_path, "r") as f:
+        index = FloatIndex.from_float_data(json.load(f))
+    try:
+        index.save_snapshot(snapshot_path, source_mtime=st.st_mtime, source_size=st.st_size)
+        print(f"Wrote float index snapshot for {index.size} floats to {snapshot_path}")
+    except OSError as e:
+        print(f"Could not write float index snapshot to {snapshot_path}: {e}")
+    return index
+
+
+def load_float_index(json_path: str, snapshot_path: Optional[str] = None) -> FloatIndex:
+    """
+    Load the float index from its snapshot, rebuilding the snapshot first when
+    meta_data.json is newer than it.
+    """
+    snapshot_path = snapshot_path or default_snapshot_path(json_path)
+    if snapshot_is_fresh(snapshot_path, json_path):
+        return FloatIndex.load_snapshot(snapshot_path)
+    return build_snapshot(json_path, snapshot_path)
+
+
+def default_snapshot_path(json_path: str) -> str:
+    return os.path.splitext(json_path)[0] + ".snapshot"
+
+
+def limit_results(float_ids: List[str], k: Union[int, str] = "all") -> List[str]:
+    """Apply the `k` argument the filter tools accept ('all' or an integer)."""
+    if k == "all":
+        return float_ids
+    try:
+        return float_ids[:int(k)]
+    except (ValueError, TypeError):
+        return float_ids
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile meta_data.json into a binary float index snapshot.")
+    parser.add_argument("json_path", nargs="?", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "meta_data.json"))
+    parser.add_argument("--snapshot", help="Snapshot directory (default: next to the JSON file)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the snapshot is up to date")
+    args = parser.parse_args()
+
+    snapshot = args.snapshot or default_snapshot_path(args.json_path)
+    if args.force or not snapshot_is_fresh(snapshot, args.json_path):
+        build_snapshot(args.json_path, snapshot)
+    else:
+        print(f"Snapshot {snapshot} is up to date")
@@ -0,0 +1,450 @@
+import os
+import json
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import xarray as xr
+import pandas as pd
+from pathlib import Path
+import warnings
+
+warnings.filterwarnings('ignore')
+
+# Profiles read from a variable at a time, so memory per float stays bounded
+CHUNK_PROFILES = 256
+
+# Map of parameter names to our keys
+PARAM_MAPPING = {
+    'TEMP': 'temp',
+    'PSAL': 'psal',
+    'PRES': 'pres',
+    'DOXY': 'doxy',
+    'FLUORESCENCE_CHLA': 'fluorescence_chla',
+    'BBP700': 'bbp700',
+    'NITRATE': 'nitrate',
+    'PH_IN_SITU_TOTAL': 'ph',
+    'TURBIDITY': 'turbidity',
+    'CDOM': 'cdom'
+}
+
+
+class RunningStats:
+    """NaN-aware running min/max/sum/count, updated one array chunk at a time"""
+    
+    def __init__(self):
+        self.min = np.inf
+        self.max = -np.inf
+        self.sum = 0.0
+        self.count = 0
+        self.invalid = False
+    
+    def update(self, values):
+        try:
+            data = np.asarray(values, dtype=np.float64).ravel()
+        except (TypeError, ValueError):
+            # Non-numeric data: the parameter reports NaN, as it always has
+            self.invalid = True
+            return
+        valid = data[~np.isnan(data)]
+        if valid.size == 0:
+            return
+        self.min = min(self.min, float(valid.min()))
+        self.max = max(self.max, float(valid.max()))
+        self.sum += float(valid.sum())
+        self.count += valid.size
+    
+    def update_variable(self, variable, chunk=CHUNK_PROFILES):
+        """Feed an xarray variable in slices along its first dimension"""
+        if variable.ndim == 0:
+            self.update(variable.values)
+            return
+        for start in range(0, variable.shape[0], chunk):
+            self.update(variable[start:start + chunk].values)
+    
+    def merge(self, other):
+        """Fold another accumulator (e.g. one file's partial stats) into this one"""
+        self.invalid = self.invalid or other.invalid
+        if other.count:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self.sum += other.sum
+            self.count += other.count
+    
+    def to_dict(self):
+        return {'min': self.min if self.count else None, 'max': self.max if self.count else None,
+                'sum': self.sum, 'count': self.count, 'invalid': self.invalid}
+    
+    @classmethod
+    def from_dict(cls, data):
+        running = cls()
+        running.sum = data['sum']
+        running.count = data['count']
+        running.invalid = data.get('invalid', False)
+        if running.count:
+            running.min = data['min']
+            running.max = data['max']
+        return running
+    
+    def result(self):
+        """(min, max, avg), or NaNs when no valid value was seen"""
+        if self.invalid or self.count == 0:
+            return float('nan'), float('nan'), float('nan')
+        return self.min, self.max, self.sum / self.count
+
+
+def convert_nan_to_null(obj):
+    """Convert NaN values to null for JSON serialization"""
+    if isinstance(obj, dict):
+        return {k: convert_nan_to_null(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [convert_nan_to_null(item) for item in obj]
+    elif isinstance(obj, float) and np.isnan(obj):
+        return None
+    else:
+        return obj
+
+
+def write_json_atomic(data, output_file):
+    """Write next to the target and swap it in, so readers never see a partial file"""
+    tmp_file = f"{output_file}.tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_file, output_file)
+
+
+def read_mission_status(meta_file):
+    """'active' while END_MISSION_DATE in the meta file is blank, else 'inactive'; None if it cannot be read"""
+    try:
+        with xr.open_dataset(meta_file) as ds:
+            end_mission_date = ds.get("END_MISSION_DATE")
+            if end_mission_date is None:
+                return "inactive"
+            value = end_mission_date.values
+            if isinstance(value, np.ndarray):
+                value = value.item() if value.size == 1 else b"".join(value.ravel())
+            if isinstance(value, bytes):
+                value = value.decode("utf-8", "ignore")
+            return "active" if not str(value).strip() else "inactive"
+    except Exception as e:
+        print(f"Error reading {meta_file}: {e}")
+        return None
+
+
+class ArgoFloatProcessor:
+    def __init__(self, data_directory):
+        self.data_directory = Path(data_directory)
+        self.float_data = {}
+        self.failed = {}
+        
+    def determine_location(self, lat, lon):
+        """Determine ocean region based on latitude and longitude"""
+        if pd.isna(lat) or pd.isna(lon):
+            return "Unknown"
+        
+        # Bay of Bengal: roughly 5-22°N, 80-100°E
+        if 5 <= lat <= 22 and 80 <= lon <= 100:
+            return "Bay of Bengal"
+        
+        # Arabian Sea: roughly 0-30°N, 50-80°E
+        elif 0 <= lat <= 30 and 50 <= lon <= 80:
+            return "Arabian Sea"
+        
+        # Indian Ocean: broader region
+        elif -50 <= lat <= 30 and 20 <= lon <= 120:
+            return "Indian Ocean"
+        
+        else:
+            return "Other"
+    
+    def safe_float_conversion(self, value):
+        """Safely convert value to float, return NaN if not possible"""
+        try:
+            if pd.isna(value):
+                return float('nan')
+            return float(value)
+        except (ValueError, TypeError):
+            return float('nan')
+    
+    def safe_str_conversion(self, value):
+        """Safely convert value to string"""
+        try:
+            if pd.isna(value):
+                return ""
+            if isinstance(value, bytes):
+                return value.decode('utf-8').strip()
+            return str(value).strip()
+        except:
+            return ""
+    
+    def process_meta_file(self, file_path, float_id):
+        """Process meta.nc file"""
+        try:
+            with xr.open_dataset(file_path) as ds:
+                meta_info = {
+                    'platform_number': self.safe_str_conversion(ds.PLATFORM_NUMBER.values),
+                    'wmo_inst_type': self.safe_str_conversion(ds.WMO_INST_TYPE.values),
+                    'project_name': self.safe_str_conversion(ds.PROJECT_NAME.values),
+                    'pi_name': self.safe_str_conversion(ds.PI_NAME.values),
+                    'data_centre': self.safe_str_conversion(ds.DATA_CENTRE.values),
+                    'launch_info': {
+                        'date': self.safe_str_conversion(ds.LAUNCH_DATE.values),
+                        'latitude': self.safe_float_conversion(ds.LAUNCH_LATITUDE.values),
+                        'longitude': self.safe_float_conversion(ds.LAUNCH_LONGITUDE.values),
+                        'platform_type': self.safe_str_conversion(ds.PLATFORM_TYPE.values),
+                        'float_serial_no': self.safe_str_conversion(ds.FLOAT_SERIAL_NO.values),
+                        'deployment_platform': self.safe_str_conversion(ds.DEPLOYMENT_PLATFORM.values) if 'DEPLOYMENT_PLATFORM' in ds else "",
+                        'deployment_cruise_id': self.safe_str_conversion(ds.DEPLOYMENT_CRUISE_ID.values) if 'DEPLOYMENT_CRUISE_ID' in ds else ""
+                    },
+                    'technical_info': {
+                        'battery_type': self.safe_str_conversion(ds.BATTERY_TYPE.values) if 'BATTERY_TYPE' in ds else "",
+                        'battery_packs': self.safe_str_conversion(ds.BATTERY_PACKS.values) if 'BATTERY_PACKS' in ds else "",
+                        'controller_board_type_primary': self.safe_str_conversion(ds.CONTROLLER_BOARD_TYPE_PRIMARY.values) if 'CONTROLLER_BOARD_TYPE_PRIMARY' in ds else "",
+                        'firmware_version': self.safe_str_conversion(ds.FIRMWARE_VERSION.values),
+                        'sensors': []
+                    }
+                }
+                
+                # Extract sensor information
+                if 'SENSOR' in ds:
+                    sensors = ds.SENSOR.values
+                    sensor_makers = ds.SENSOR_MAKER.values if 'SENSOR_MAKER' in ds else []
+                    sensor_models = ds.SENSOR_MODEL.values if 'SENSOR_MODEL' in ds else []
+                    sensor_serials = ds.SENSOR_SERIAL_NO.values if 'SENSOR_SERIAL_NO' in ds else []
+                    
+                    for i, sensor in enumerate(sensors):
+                        sensor_info = {
+                            'name': self.safe_str_conversion(sensor),
+                            'maker': self.safe_str_conversion(sensor_makers[i]) if i < len(sensor_makers) else "",
+                            'model': self.safe_str_conversion(sensor_models[i]) if i < len(sensor_models) else "",
+                            'serial_no': self.safe_str_conversion(sensor_serials[i]) if i < len(sensor_serials) else ""
+                        }
+                        meta_info['technical_info']['sensors'].append(sensor_info)
+                
+                # Determine location
+                lat = meta_info['launch_info']['latitude']
+                lon = meta_info['launch_info']['longitude']
+                meta_info['location'] = self.determine_location(lat, lon)
+                
+                return meta_info
+        except Exception as e:
+            print(f"Error processing meta file {file_path}: {e}")
+            return None
+    
+    def process_profile_files(self, float_dir, float_id):
+        """Process all profile files (prof.nc and cycle files) for a float"""
+        all_stats = {key: RunningStats() for key in PARAM_MAPPING.values()}
+        max_cycle_number = 0
+        
+        # Process main profile file
+        prof_file = float_dir / f"{float_id}_prof.nc"
+        if prof_file.exists():
+            try:
+                with xr.open_dataset(prof_file) as ds:
+                    # Get maximum cycle number from profile file
+                    if 'CYCLE_NUMBER' in ds:
+                        cycle_nums = ds.CYCLE_NUMBER.values
+                        valid_cycles = cycle_nums[~np.isnan(cycle_nums)]
+                        if len(valid_cycles) > 0:
+                            max_cycle_number = max(max_cycle_number, int(np.max(valid_cycles)))
+                    
+                    # Extract data for each parameter
+                    for param in ['TEMP', 'PSAL', 'PRES']:
+                        if param in ds:
+                            all_stats[param.lower()].update_variable(ds[param])
+            except Exception as e:
+                print(f"Error processing profile file {prof_file}: {e}")
+        
+        # Process cycle files (e.g., *_001.nc, *_002.nc, etc.)
+        cycle_files = list(float_dir.glob(f"{float_id}_[0-9][0-9][0-9].nc"))
+        
+        for cycle_file in cycle_files:
+            try:
+                with xr.open_dataset(cycle_file) as ds:
+                    # Get maximum cycle number from cycle file
+                    if 'CYCLE_NUMBER' in ds:
+                        cycle_nums = ds.CYCLE_NUMBER.values
+                        valid_cycles = cycle_nums[~np.isnan(cycle_nums)]
+                        if len(valid_cycles) > 0:
+                            max_cycle_number = max(max_cycle_number, int(np.max(valid_cycles)))
+                    
+                    for nc_param, key in PARAM_MAPPING.items():
+                        if nc_param in ds:
+                            all_stats[key].update_variable(ds[nc_param])
+            except Exception as e:
+                print(f"Error processing cycle file {cycle_file}: {e}")
+        
+        # Also check trajectory file for cycle numbers
+        traj_file = float_dir / f"{float_id}_Rtraj.nc"
+        if traj_file.exists():
+            try:
+                with xr.open_dataset(traj_file) as ds:
+                    if 'CYCLE_NUMBER' in ds:
+                        cycle_nums = ds.CYCLE_NUMBER.values
+                        valid_cycles = cycle_nums[~np.isnan(cycle_nums)]
+                        if len(valid_cycles) > 0:
+                            max_cycle_number = max(max_cycle_number, int(np.max(valid_cycles)))
+            except Exception as e:
+                print(f"Error processing trajectory file {traj_file}: {e}")
+        
+        # Calculate statistics for each parameter
+        stats = {}
+        for param, running in all_stats.items():
+            min_val, max_val, avg_val = running.result()
+            stats[f'{param}_min'] = min_val
+            stats[f'{param}_max'] = max_val
+            stats[f'{param}_avg'] = avg_val
+        
+        return stats, max_cycle_number
+    
+    def empty_float_info(self, float_id):
+        """Float data structure with every field at its empty value"""
+        return {
+            "platform_number": float_id,
+            "wmo_inst_type": "",
+            "project_name": "",
+            "pi_name": "",
+            "data_centre": "",
+            "launch_info": {
+                "date": "",
+                "latitude": float('nan'),
+                "longitude": float('nan'),
+                "platform_type": "",
+                "float_serial_no": "",
+                "deployment_platform": "",
+                "deployment_cruise_id": ""
+            },
+            "location": "",
+            "temp_max": float('nan'),
+            "temp_min": float('nan'),
+            "temp_avg": float('nan'),
+            "psal_max": float('nan'),
+            "psal_min": float('nan'),
+            "psal_avg": float('nan'),
+            "pres_max": float('nan'),
+            "pres_min": float('nan'),
+            "pres_avg": float('nan'),
+            "doxy_max": float('nan'),
+            "doxy_min": float('nan'),
+            "doxy_avg": float('nan'),
+            "fluorescence_chla_max": float('nan'),
+            "fluorescence_chla_min": float('nan'),
+            "fluorescence_chla_avg": float('nan'),
+            "bbp700_max": float('nan'),
+            "bbp700_min": float('nan'),
+            "bbp700_avg": float('nan'),
+            "nitrate_max": float('nan'),
+            "nitrate_min": float('nan'),
+            "nitrate_avg": float('nan'),
+            "ph_max": float('nan'),
+            "ph_min": float('nan'),
+            "ph_avg": float('nan'),
+            "turbidity_max": float('nan'),
+            "turbidity_min": float('nan'),
+            "turbidity_avg": float('nan'),
+            "cdom_max": float('nan'),
+            "cdom_min": float('nan'),
+            "cdom_avg": float('nan'),
+            "technical_info": {
+                "battery_type": "",
+                "battery_packs": "",
+                "controller_board_type_primary": "",
+                "firmware_version": "",
+                "sensors": []
+            },
+            "cycles": 0,
+            "launch_quality": "",
+            "data_source": "",
+            "status": "",
+            "last_updated": ""
+        }
+    
+    def build_float_info(self, float_id, meta_file, stats, cycles):
+        """Combine meta file fields with already computed statistics and cycle count"""
+        float_info = self.empty_float_info(float_id)
+        if meta_file is not None and Path(meta_file).exists():
+            meta_info = self.process_meta_file(meta_file, float_id)
+            if meta_info:
+                float_info.update(meta_info)
+        float_info.update(stats)
+        float_info['cycles'] = cycles
+        return float_info
+    
+    def process_float(self, float_dir):
+        """Process all files for a single float"""
+        float_id = float_dir.name
+        stats, max_cycle_number = self.process_profile_files(float_dir, float_id)
+        return self.build_float_info(float_id, float_dir / f"{float_id}_meta.nc", stats, max_cycle_number)
+    
+    def find_float_dirs(self):
+        """Float directories (named by WMO number), in a stable order"""
+        return sorted(
+            (d for d in self.data_directory.iterdir() if d.is_dir() and d.name.isdigit()),
+            key=lambda d: d.name,
+        )
+    
+    def process_all_floats(self, workers=None):
+        """
+        Process all float directories across a process pool. Results are keyed
+        and ordered by float ID, so the output does not depend on completion order.
+        """
+        float_dirs = self.find_float_dirs()
+        workers = workers or os.cpu_count() or 1
+        print(f"Found {len(float_dirs)} float directories, using {workers} workers")
+        
+        results = {}
+        self.failed = {}
+        started = time.monotonic()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self.process_float, d): d.name for d in float_dirs}
+            for done, future in enumerate(as_completed(futures), start=1):
+                float_id = futures[future]
+                try:
+                    results[float_id] = future.result()
+                except Exception as e:
+                    self.failed[float_id] = f"{type(e).__name__}: {e}"
+                    print(f"Error processing float {float_id}: {e}")
+                elapsed = time.monotonic() - started
+                print(f"[{done}/{len(float_dirs)}] {float_id} ({done / max(elapsed, 1e-9):.1f} floats/s)")
+        
+        self.float_data = {float_id: results[float_id] for float_id in sorted(results)}
+        return self.float_data
+    
+    def save_json(self, output_file):
+        """Save processed data to JSON file"""
+        write_json_atomic(convert_nan_to_null(self.float_data), output_file)
+        
+        print(f"Data saved to {output_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build float metadata JSON from Argo float directories.")
+    parser.add_argument("data_directory", help="directory containing one sub-directory per float")
+    parser.add_argument("-o", "--output", default="meta_data.json", help="output JSON file")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+    
+    # Check if directory exists
+    if not os.path.exists(args.data_directory):
+        print(f"Data directory {args.data_directory} does not exist!")
+        raise SystemExit(1)
+    
+    # Initialize processor
+    processor = ArgoFloatProcessor(args.data_directory)
+    
+    # Process all floats
+    print("Starting to process Argo float data...")
+    started = time.monotonic()
+    float_data = processor.process_all_floats(args.workers)
+    
+    # Save to JSON
+    processor.save_json(args.output)
+    
+    print(f"Processing complete! Found {len(float_data)} floats in {time.monotonic() - started:.1f}s.")
+    if processor.failed:
+        print(f"{len(processor.failed)} floats failed: {', '.join(sorted(processor.failed))}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import copy
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+
+PLAN_CACHE_SIZE = 512
+PLAN_CACHE_TTL_SECONDS = 24 * 60 * 60
+# Set ARGO_PLAN_CACHE_PATH to keep plans across restarts
+PLAN_CACHE_PATH = os.environ.get("ARGO_PLAN_CACHE_PATH")
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a sub-query: lower case, no punctuation, single spaces."""
+    text = re.sub(r"[^\w\s.<>=-]", " ", query.lower())
+    text = re.sub(r"(?<!\d)\.|\.(?!\d)", " ", text)
+    words = [word for word in text.split() if word not in ("the", "please")]
+    return " ".join(words)
+
+
+class PlanCache:
+    """
+    LRU + TTL cache from normalized sub-query text to parsed tool calls.
+
+    Only the LLM planning step is cached; the tools still run against the
+    current FLOAT_DATA. When a path is given, entries are loaded from and
+    written back to a JSON file.
+    """
+
+    def __init__(self, max_size: int = PLAN_CACHE_SIZE, ttl_seconds: float = PLAN_CACHE_TTL_SECONDS, path: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load()
+
+    def get(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[0])
+
+    def put(self, query: str, tool_calls: List[Dict[str, Any]]):
+        key = normalize_query(query)
+        with self._lock:
+            self._entries[key] = (copy.deepcopy(tool_calls), time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            if self.path:
+                self._save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.path:
+                self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+            }
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not load plan cache from {self.path}: {e}")
+            return
+        now = time.time()
+        for key, entry in sorted(stored.items(), key=lambda item: item[1]["created"]):
+            if now - entry["created"] <= self.ttl_seconds:
+                self._entries[key] = (entry["tool_calls"], entry["created"])
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _save(self):
+        stored = {key: {"tool_calls": calls, "created": created} for key, (calls, created) in self._entries.items()}
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not save plan cache to {self.path}: {e}")
+
+
+# Shared by every agent instance in the process
+PLAN_CACHE = PlanCache(path=PLAN_CACHE_PATH)
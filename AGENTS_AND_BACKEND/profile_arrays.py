@@ -0,0 +1,76 @@
+import json
+import math
+import os
+
+import numpy as np
+from psycopg2 import extensions
+
+
+# Postgres type OIDs for real[] and double precision[]
+FLOAT_ARRAY_OIDS = (1021, 1022)
+# Argo QC flags marking bad, probably bad, or missing values
+BAD_QC_FLAGS = np.array(["3", "4", "9"])
+# Set ARGO_SQL_MASK_BAD_QC=1 to blank out values whose QC flag marks them bad
+MASK_BAD_QC = os.environ.get("ARGO_SQL_MASK_BAD_QC", "").lower() in ("1", "true", "yes")
+
+
+def parse_float_array(value, cur):
+    """Decode a real[]/double precision[] text literal straight into a float64 array."""
+    if value is None:
+        return None
+    body = value[1:-1]
+    if not body:
+        return np.empty(0, dtype=np.float64)
+    if "{" in body:
+        # Multi-dimensional; only seen from hand-written SQL
+        nested = value.replace("{", "[").replace("}", "]").replace("NULL", "NaN")
+        return np.array(json.loads(nested), dtype=np.float64)
+    return np.fromstring(body.replace("NULL", "NaN"), dtype=np.float64, sep=",")
+
+
+FLOAT_ARRAY = extensions.new_type(FLOAT_ARRAY_OIDS, "FLOAT_NDARRAY", parse_float_array)
+
+
+def register_array_types(conn_or_cursor):
+    """Make float array columns arrive as NumPy arrays on this connection or cursor."""
+    extensions.register_type(FLOAT_ARRAY, conn_or_cursor)
+
+
+def mask_bad_qc(values: np.ndarray, qc) -> np.ndarray:
+    """Copy of values with NaN wherever the matching QC flag is bad."""
+    if qc is None or len(qc) != len(values):
+        return values
+    bad = np.isin(np.asarray(qc, dtype=str), BAD_QC_FLAGS)
+    if not bad.any():
+        return values
+    masked = values.copy()
+    masked[bad] = np.nan
+    return masked
+
+
+def to_json_compatible(value):
+    """
+    Convert NumPy arrays (and NaN floats) in a result to plain lists with None
+    for missing values. Only the containers are walked in Python; array
+    contents are converted in one vectorized step each.
+    """
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind != "f":
+            return value.tolist()
+        if value.dtype == np.float32:
+            # Columnar store arrays; round-trip through the shortest float32
+            # text so values read like Postgres REAL output (12.3, not 12.300000190734863)
+            value = value.astype(str).astype(np.float64)
+        converted = value.tolist()
+        if value.ndim == 1:
+            for i in np.flatnonzero(np.isnan(value)).tolist():
+                converted[i] = None
+            return converted
+        return to_json_compatible(converted)
+    if isinstance(value, dict):
+        return {key: to_json_compatible(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_json_compatible(item) for item in value]
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
@@ -0,0 +1,549 @@
+import argparse
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from typing import Dict, Any, Iterable, List, Optional
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # only needed for the columnar backend
+    pa = pc = pq = None
+try:
+    import duckdb
+except ImportError:  # only needed to run SQL against the store
+    duckdb = None
+
+
+# Set ARGO_PROFILE_STORE to a directory to enable the columnar backend
+PROFILE_STORE_PATH = os.environ.get("ARGO_PROFILE_STORE")
+# Parquet codec for new partitions (zstd, snappy, lz4 or none)
+STORE_COMPRESSION = os.environ.get("ARGO_PROFILE_STORE_COMPRESSION", "zstd")
+PARTITION_FILE = "profiles.parquet"
+# Per float: path -> [size, mtime] of the NetCDF files its partitions were built from
+MANIFEST_FILE = "manifest.json"
+# Depth-binned summaries (the argo_profile_bins rows) live next to the profiles
+BINS_FILE = "bins.parquet"
+# Rows per Arrow batch when streaming query results
+QUERY_BATCH_ROWS = 200
+UNKNOWN_YEAR = "unknown"
+
+META_COLUMNS = ["float_id", "cycle_number", "juld", "latitude", "longitude", "file_type", "data_mode"]
+# When several files describe one cycle, columns are filled in this file type order
+FILE_TYPE_ORDER = ["D", "BD", "SD"]
+# Read per cycle when present; any other column is a profile array
+SCALAR_COLUMNS = set(META_COLUMNS)
+
+
+class StoreQueryError(ValueError):
+    """Raised when generated SQL cannot be answered from the columnar store."""
+
+
+def require_pyarrow():
+    if pa is None:
+        raise RuntimeError("The columnar profile store needs pyarrow: pip install pyarrow")
+
+
+def require_duckdb():
+    if duckdb is None:
+        raise RuntimeError("Running SQL against the columnar profile store needs duckdb: pip install duckdb")
+
+
+def profile_schema(profile_columns: List[str]):
+    """argo_profiles columns as Arrow types: float32 lists for values, string lists for QC flags."""
+    require_pyarrow()
+    fields = [
+        pa.field("float_id", pa.string()),
+        pa.field("cycle_number", pa.int32()),
+        pa.field("juld", pa.timestamp("ms")),
+        pa.field("latitude", pa.float64()),
+        pa.field("longitude", pa.float64()),
+    ]
+    for col in profile_columns:
+        if col in SCALAR_COLUMNS:
+            continue
+        value_type = pa.string() if col.endswith("_qc") else pa.float32()
+        fields.append(pa.field(col, pa.list_(value_type)))
+    fields += [pa.field("file_type", pa.string()), pa.field("data_mode", pa.string())]
+    return pa.schema(fields)
+
+
+def bins_schema():
+    """argo_profile_bins columns as Arrow types."""
+    require_pyarrow()
+    return pa.schema([
+        pa.field("float_id", pa.string()),
+        pa.field("cycle_number", pa.int32()),
+        pa.field("file_type", pa.string()),
+        pa.field("juld", pa.timestamp("ms")),
+        pa.field("latitude", pa.float64()),
+        pa.field("longitude", pa.float64()),
+        pa.field("parameter", pa.string()),
+        pa.field("pres_min", pa.float32()),
+        pa.field("pres_max", pa.float32()),
+        pa.field("count", pa.int32()),
+        pa.field("min", pa.float32()),
+        pa.field("max", pa.float32()),
+        pa.field("mean", pa.float32()),
+    ])
+
+
+def row_year(juld) -> str:
+    match = re.match(r"(\d{4})-", str(juld or ""))
+    return match.group(1) if match else UNKNOWN_YEAR
+
+
+def to_timestamp(juld) -> Optional[np.datetime64]:
+    if juld is None or str(juld) in ("NaT", "None", ""):
+        return None
+    return np.datetime64(str(juld), "ms")
+
+
+class ProfileStore:
+    """
+    Argo profiles on disk as Parquet, one file per float and year:
+
+        <root>/float_id=<id>/year=<yyyy>/profiles.parquet
+
+    Each row is one profile file (float, cycle, file type) like argo_profiles;
+    value arrays are zstd-compressed float32 lists (NaN for missing values) and
+    QC flags are string lists. bins.parquet next to each partition holds the
+    argo_profile_bins rows of those profiles. Reads only open the partitions of
+    the requested floats and years, only decode the requested columns, and
+    memory-map the files. The arrays handed back are NumPy views over the
+    decoded Arrow buffers, so nothing is copied per cycle. query() runs
+    generated SQL over the same partitions with DuckDB.
+    """
+
+    def __init__(self, root: str, compression: str = STORE_COMPRESSION):
+        require_pyarrow()
+        self.root = root
+        self.compression = None if compression == "none" else compression
+
+    def float_dir(self, float_id: str) -> str:
+        return os.path.join(self.root, f"float_id={float_id}")
+
+    def partitions(self, float_id: str, start_year: Optional[int] = None, end_year: Optional[int] = None,
+                   file_name: str = PARTITION_FILE) -> List[str]:
+        """Partition files of a float, oldest year first, pruned to [start_year, end_year]."""
+        float_dir = self.float_dir(float_id)
+        try:
+            names = sorted(os.listdir(float_dir))
+        except OSError:
+            return []
+        paths = []
+        for name in names:
+            year = name.partition("=")[2]
+            if year.isdigit() and (
+                (start_year is not None and int(year) < start_year) or (end_year is not None and int(year) > end_year)
+            ):
+                continue
+            path = os.path.join(float_dir, name, file_name)
+            if os.path.exists(path):
+                paths.append(path)
+        return paths
+
+    def float_ids(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name.partition("=")[2] for name in os.listdir(self.root) if name.startswith("float_id="))
+
+    def columns(self) -> List[str]:
+        """Columns stored for the profiles, from the schema of any one partition."""
+        for float_id in self.float_ids():
+            for path in self.partitions(float_id):
+                return pq.read_schema(path).names
+        return []
+
+    def read_manifest(self, float_id: str) -> Dict[str, List[float]]:
+        try:
+            with open(os.path.join(self.float_dir(float_id), MANIFEST_FILE), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def write_manifest(self, float_id: str, manifest: Dict[str, List[float]]):
+        path = os.path.join(self.float_dir(float_id), MANIFEST_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+
+    # --- writing ---
+
+    def write_float(self, float_id: str, profiles: Iterable[tuple], profile_columns: List[str],
+                    bin_columns: Optional[List[str]] = None):
+        """
+        Replace every partition of float_id with profiles, given as (row, bins)
+        pairs: row is a tuple in profile_columns order and bins its
+        argo_profile_bins tuples in bin_columns order, as decoded by
+        sql_setup. Like the database upsert, a delayed-mode row wins over a
+        real-time row for the same profile.
+        """
+        from sql_setup import data_mode_rank
+
+        schema = profile_schema(profile_columns)
+        latest = {}
+        for row, bins in profiles:
+            values = dict(zip(profile_columns, row))
+            key = (values["cycle_number"], values["file_type"])
+            if key not in latest or data_mode_rank(values["data_mode"]) >= data_mode_rank(latest[key][0]["data_mode"]):
+                latest[key] = (values, bins or [])
+
+        by_year = defaultdict(list)
+        bins_by_year = defaultdict(list)
+        for key in sorted(latest, key=lambda k: (k[0], str(k[1]))):
+            values, bins = latest[key]
+            year = row_year(values["juld"])
+            by_year[year].append(values)
+            if bin_columns:
+                bins_by_year[year].extend(dict(zip(bin_columns, b)) for b in bins)
+
+        float_dir = self.float_dir(float_id)
+        stale = set(os.listdir(float_dir)) if os.path.isdir(float_dir) else set()
+        for year, year_rows in by_year.items():
+            directory = os.path.join(float_dir, f"year={year}")
+            self._write_partition(directory, PARTITION_FILE, year_rows, schema)
+            if bins_by_year.get(year):
+                self._write_partition(directory, BINS_FILE, bins_by_year[year], bins_schema())
+            elif os.path.exists(os.path.join(directory, BINS_FILE)):
+                os.remove(os.path.join(directory, BINS_FILE))
+            stale.discard(f"year={year}")
+        for name in stale:
+            for file_name in (PARTITION_FILE, BINS_FILE):
+                path = os.path.join(float_dir, name, file_name)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _write_partition(self, directory: str, file_name: str, rows: List[Dict[str, Any]], schema):
+        arrays = []
+        for field in schema:
+            column = [row.get(field.name) for row in rows]
+            if field.name == "juld":
+                column = [to_timestamp(value) for value in column]
+            elif pa.types.is_list(field.type) and pa.types.is_floating(field.type.value_type):
+                column = [None if value is None else np.asarray(value, dtype=np.float32) for value in column]
+            arrays.append(pa.array(column, type=field.type))
+        table = pa.Table.from_arrays(arrays, schema=schema)
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, file_name)
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table, tmp_path, compression=self.compression)
+        os.replace(tmp_path, path)
+
+    # --- reading ---
+
+    def read_float(self, float_id: str, columns: Optional[List[str]] = None,
+                   start: Optional[str] = None, end: Optional[str] = None):
+        """
+        Arrow table of one float's profiles, ordered by cycle. columns limits
+        the decoded profile columns (meta columns are always read); start/end
+        are ISO dates that prune partitions by year, then rows by juld.
+        """
+        start_year = int(start[:4]) if start else None
+        end_year = int(end[:4]) if end else None
+        paths = self.partitions(float_id, start_year, end_year)
+        if not paths:
+            return None
+        wanted = None
+        if columns is not None:
+            available = pq.read_schema(paths[0]).names
+            wanted = META_COLUMNS + [col for col in columns if col in available and col not in SCALAR_COLUMNS]
+        tables = [pq.read_table(path, columns=wanted, memory_map=True) for path in paths]
+        table = tables[0] if len(tables) == 1 else pa.concat_tables(tables)
+        if start or end:
+            juld = table.column("juld")
+            keep = pc.is_valid(juld)
+            if start:
+                keep = pc.and_(keep, pc.greater_equal(juld, pa.scalar(np.datetime64(start[:10], "ms"))))
+            if end:
+                # end is inclusive: everything before the start of the next day
+                next_day = (np.datetime64(end[:10], "D") + 1).astype("datetime64[ms]")
+                keep = pc.and_(keep, pc.less(juld, pa.scalar(next_day)))
+            table = table.filter(keep)
+        return table
+
+    def iter_cycles(self, float_id: str, columns: Optional[List[str]] = None,
+                    start: Optional[str] = None, end: Optional[str] = None):
+        """
+        Yield one row dict per cycle, shaped like an argo_profiles row: float
+        arrays as zero-copy float32 NumPy views, QC flags as lists. When a cycle
+        has several file types (core, BGC, synthetic), each column comes from
+        the first file type in FILE_TYPE_ORDER that has it.
+        """
+        table = self.read_float(float_id, columns, start, end)
+        if table is None or table.num_rows == 0:
+            return
+        scalars = {col: table.column(col).to_pylist() for col in META_COLUMNS}
+        arrays = {col: list_views(table.column(col)) for col in table.column_names if col not in SCALAR_COLUMNS}
+
+        order = {file_type: i for i, file_type in enumerate(FILE_TYPE_ORDER)}
+        by_cycle = defaultdict(list)
+        for i, cycle in enumerate(scalars["cycle_number"]):
+            by_cycle[cycle].append(i)
+        for cycle in sorted(by_cycle):
+            positions = sorted(by_cycle[cycle], key=lambda i: order.get(scalars["file_type"][i], len(order)))
+            first = positions[0]
+            row = {col: scalars[col][first] for col in ("float_id", "cycle_number", "juld", "latitude", "longitude")}
+            for col, views in arrays.items():
+                row[col] = next((views[i] for i in positions if views[i] is not None), None)
+            yield row
+
+
+    # --- SQL ---
+
+    def connect(self, float_ids: List[str], start_year: Optional[int] = None, end_year: Optional[int] = None):
+        """
+        DuckDB connection with argo_profiles and argo_profile_bins views over
+        the partitions of float_ids only, or None if none of them is stored.
+        """
+        require_duckdb()
+        profile_paths = [path for fid in float_ids for path in self.partitions(fid, start_year, end_year)]
+        if not profile_paths:
+            return None
+        bin_paths = [path for fid in float_ids for path in self.partitions(fid, start_year, end_year, BINS_FILE)]
+        conn = duckdb.connect()
+        conn.execute(f"CREATE VIEW argo_profiles AS SELECT * FROM read_parquet({sql_string_list(profile_paths)}, union_by_name = true, hive_partitioning = false)")
+        if bin_paths:
+            conn.execute(f"CREATE VIEW argo_profile_bins AS SELECT * FROM read_parquet({sql_string_list(bin_paths)}, union_by_name = true, hive_partitioning = false)")
+        return conn
+
+    def query(self, sql_query: str, float_ids: List[str], max_rows: Optional[int] = None,
+              max_bytes: Optional[int] = None, choose_columns=None, notes: Optional[List[str]] = None):
+        """
+        Run generated SQL (Postgres dialect, IDs bound as %(float_ids)s) with
+        DuckDB over the Parquet partitions of float_ids, and yield its rows as
+        dicts ordered by float_id, cycle_number, file_type. choose_columns(columns) may
+        return a subset of the result columns to keep. At most max_rows rows
+        are returned, and reading stops once max_bytes of results have been
+        read; each reduction is added to notes. Raises StoreQueryError for SQL
+        the store cannot run.
+        """
+        sql = translate_sql(sql_query)
+        conn = self.connect(float_ids, *year_window(sql))
+        if conn is None:
+            return
+        params = {"float_ids": list(float_ids)} if "$float_ids" in sql else None
+        notes = notes if notes is not None else []
+        try:
+            try:
+                columns = [desc[0] for desc in conn.execute(f"SELECT * FROM ({sql}) AS store_query LIMIT 0", params).description]
+                for required in ("float_id", "cycle_number", "file_type"):
+                    if required not in columns:
+                        raise StoreQueryError(f"The query must return {required} to be answered from the columnar store.")
+                kept = choose_columns(columns) if choose_columns else columns
+                if len(kept) < len(columns):
+                    notes.append(f"dropped {len(columns) - len(kept)} QC/error or extra columns")
+                wrapped = (f"SELECT {', '.join(quote_identifier(col) for col in kept)} FROM ({sql}) AS store_query "
+                           "ORDER BY float_id, cycle_number, file_type")
+                if max_rows is not None:
+                    wrapped += f" LIMIT {int(max_rows) + 1}"
+                reader = conn.execute(wrapped, params).fetch_record_batch(QUERY_BATCH_ROWS)
+            except duckdb.Error as e:
+                raise StoreQueryError(f"The columnar profile store cannot run this query: {e}") from e
+
+            returned, read_bytes = 0, 0
+            for batch in reader:
+                read_bytes += batch.nbytes
+                for row in batch_rows(batch):
+                    if max_rows is not None and returned >= max_rows:
+                        notes.append(f"limited to {max_rows} profiles")
+                        return
+                    returned += 1
+                    yield row
+                if max_bytes is not None and read_bytes > max_bytes:
+                    notes.append(f"stopped at the {max_bytes / 1e6:.0f} MB result budget after {returned} profiles")
+                    return
+        finally:
+            conn.close()
+
+
+def list_views(column) -> List[Any]:
+    """
+    One entry per row of a list column: a NumPy view into the Arrow values
+    buffer for float lists, a Python list for other lists, None for nulls.
+    """
+    views = []
+    for chunk in getattr(column, "chunks", [column]):
+        valid = chunk.is_valid().to_numpy(zero_copy_only=False)
+        if not pa.types.is_floating(chunk.type.value_type):
+            views.extend(chunk.to_pylist())
+            continue
+        offsets = chunk.offsets.to_numpy()
+        values = chunk.values
+        flat = values.to_numpy(zero_copy_only=values.null_count == 0)
+        views.extend(
+            flat[offsets[i]:offsets[i + 1]] if valid[i] else None
+            for i in range(len(chunk))
+        )
+    return views
+
+
+def batch_rows(batch) -> List[Dict[str, Any]]:
+    """Rows of an Arrow record batch as dicts, float lists as NumPy views."""
+    columns = {}
+    for name, column in zip(batch.schema.names, batch.columns):
+        columns[name] = list_views(column) if pa.types.is_list(column.type) else column.to_pylist()
+    return [{name: values[i] for name, values in columns.items()} for i in range(batch.num_rows)]
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def sql_string_list(values: List[str]) -> str:
+    return "[" + ", ".join("'" + value.replace("'", "''") + "'" for value in values) + "]"
+
+
+# point(lon, lat) <@ box(point(lon1, lat1), point(lon2, lat2)) and point(...) <-> point(...),
+# as the SQL prompt asks for them; DuckDB has no geometric types, so both are spelled out
+_ARG = r"\s*([^(),]+?)\s*"
+_POINT = rf"point\({_ARG},{_ARG}\)"
+_IN_BOX = re.compile(rf"{_POINT}\s*<@\s*box\(\s*{_POINT}\s*,\s*{_POINT}\s*\)", re.I)
+_DISTANCE = re.compile(rf"{_POINT}\s*<->\s*{_POINT}", re.I)
+
+
+def translate_sql(sql_query: str) -> str:
+    """
+    Adapt generated Postgres SQL (float IDs bound as %(float_ids)s, literal %
+    escaped as %%) to DuckDB. Raises StoreQueryError for operators the store
+    cannot evaluate.
+    """
+    sql = sql_query.replace("%(float_ids)s", "$float_ids").replace("%%", "%")
+    sql = _IN_BOX.sub(
+        lambda m: "({0} BETWEEN least({2}, {4}) AND greatest({2}, {4}) AND {1} BETWEEN least({3}, {5}) AND greatest({3}, {5}))".format(*m.groups()),
+        sql,
+    )
+    sql = _DISTANCE.sub(lambda m: "sqrt(power(({0}) - ({2}), 2) + power(({1}) - ({3}), 2))".format(*m.groups()), sql)
+    for operator in ("<@", "@>", "<->", "&&"):
+        if operator in sql:
+            raise StoreQueryError(f"The columnar profile store cannot evaluate the '{operator}' operator in this query.")
+    return sql
+
+
+_JULD_LOWER = re.compile(r"\bjuld\s*>=?\s*(?:timestamp\s+|date\s+)?'(\d{4})", re.I)
+_JULD_UPPER = re.compile(r"\bjuld\s*<=?\s*(?:timestamp\s+|date\s+)?'(\d{4})", re.I)
+_JULD_BETWEEN = re.compile(
+    r"\bjuld\s+between\s+(?:timestamp\s+|date\s+)?'(\d{4})[^']*'\s+and\s+(?:timestamp\s+|date\s+)?'(\d{4})", re.I
+)
+
+
+def year_window(sql_query: str):
+    """
+    (start_year, end_year) implied by plain juld bounds in a single SELECT
+    without OR/NOT, used to skip partitions; (None, None) whenever pruning
+    could change the answer.
+    """
+    text = sql_query.lower()
+    if text.count("select") != 1 or re.search(r"\b(or|not)\b", text):
+        return None, None
+    starts = [int(y) for y in _JULD_LOWER.findall(sql_query)]
+    ends = [int(y) for y in _JULD_UPPER.findall(sql_query)]
+    for start, end in _JULD_BETWEEN.findall(sql_query):
+        starts.append(int(start))
+        ends.append(int(end))
+    return (max(starts) if starts else None), (min(ends) if ends else None)
+
+
+def file_signatures(paths: List[str]) -> Dict[str, List[float]]:
+    signatures = {}
+    for path in paths:
+        st = os.stat(path)
+        signatures[path] = [st.st_size, st.st_mtime]
+    return signatures
+
+
+def build_store(dataset_path: str, store_path: str, workers: Optional[int] = None,
+                realtime: bool = False, force: bool = False) -> Dict[str, int]:
+    """
+    Decode the NetCDF profile files under dataset_path (with sql_setup's
+    worker pool) straight into the store; Postgres is not needed. Like the
+    database manifest, each float records the path, size and mtime of the
+    files it was built from, and is skipped while that set is unchanged. A
+    float is written as soon as its last file is decoded, so only in-flight
+    floats are held in memory; if any of its files fails to decode it is left
+    as it was, and retried on the next run.
+    """
+    from sql_setup import BIN_COLUMNS, PROFILE_COLUMNS, decode_files, find_profile_files, parse_filename
+
+    store = ProfileStore(store_path)
+    workers = workers or os.cpu_count() or 1
+    by_float = defaultdict(list)
+    for path in find_profile_files(dataset_path, realtime):
+        float_id, _ = parse_filename(os.path.basename(path))
+        if float_id is not None:
+            by_float[float_id].append(path)
+
+    files, skipped, signatures = [], 0, {}
+    for float_id, paths in by_float.items():
+        signatures[float_id] = file_signatures(paths)
+        if not force and store.read_manifest(float_id) == signatures[float_id]:
+            skipped += 1
+            continue
+        files.extend(paths)
+    remaining = {float_id: len(paths) for float_id, paths in by_float.items()}
+    print(f"Building profile store in {store_path}: {len(files)} files, {skipped} floats unchanged, {workers} workers")
+
+    started = time.monotonic()
+    pending_rows = defaultdict(list)
+    floats, failed, failed_floats = 0, [], set()
+    for (path, *_), _, decoded, error in decode_files(((path, None, None, None) for path in files), workers):
+        float_id, _ = parse_filename(os.path.basename(path))
+        if error:
+            failed.append(path)
+            failed_floats.add(float_id)
+            print(f"⚠️ Skipping {path}: {error}")
+        else:
+            pending_rows[float_id].append((decoded[0], decoded[1]))
+        remaining[float_id] -= 1
+        if remaining[float_id] == 0:
+            profiles = pending_rows.pop(float_id, [])
+            if float_id in failed_floats:
+                print(f"⚠️ Keeping the stored partitions of float {float_id}: some of its files failed")
+            elif profiles:
+                store.write_float(float_id, profiles, PROFILE_COLUMNS, BIN_COLUMNS)
+                store.write_manifest(float_id, signatures[float_id])
+                floats += 1
+    print(f"✅ Wrote {floats} floats in {time.monotonic() - started:.1f}s, {len(failed)} files failed")
+    return {"floats": floats, "skipped": skipped, "failed": len(failed)}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build or inspect the columnar (Parquet) Argo profile store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="decode NetCDF profile files into the store")
+    build.add_argument("dataset_path", help="directory tree containing the profile .nc files")
+    build.add_argument("--store", default=PROFILE_STORE_PATH, help="store directory (default: $ARGO_PROFILE_STORE)")
+    build.add_argument("--workers", type=int, default=None, help="decoder processes (default: CPU count)")
+    build.add_argument("--realtime", action="store_true", help="also load real-time (R/BR/SR) files")
+    build.add_argument("--force", action="store_true", help="rewrite floats even if their partitions are current")
+
+    show = sub.add_parser("show", help="print the cycles stored for one float")
+    show.add_argument("float_id")
+    show.add_argument("--store", default=PROFILE_STORE_PATH, help="store directory (default: $ARGO_PROFILE_STORE)")
+    show.add_argument("--columns", default=None, help="comma-separated profile columns to read")
+    show.add_argument("--start", default=None, help="first date, YYYY-MM-DD")
+    show.add_argument("--end", default=None, help="last date, YYYY-MM-DD")
+
+    args = parser.parse_args(argv)
+    if not args.store:
+        parser.error("no store directory: pass --store or set ARGO_PROFILE_STORE")
+
+    if args.command == "build":
+        build_store(args.dataset_path, args.store, args.workers, args.realtime, args.force)
+    else:
+        columns = [col.strip() for col in args.columns.split(",")] if args.columns else None
+        for row in ProfileStore(args.store).iter_cycles(args.float_id, columns, args.start, args.end):
+            arrays = {col: len(val) for col, val in row.items() if isinstance(val, (np.ndarray, list))}
+            print(row["cycle_number"], row["juld"], row["latitude"], row["longitude"], arrays)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import json
+from typing import List, Dict, Any, Optional
+
+from db import connection
+
+
+# Tables whose full scans are worth flagging (rows carry large REAL[] profiles)
+WATCHED_TABLES = {"argo_profiles"}
+
+
+def explain(conn, sql_query: str, params=None, verbose: bool = False) -> Dict[str, Any]:
+    """
+    Return the planner's top plan node for sql_query, without running it.
+    With verbose=True each node also lists its "Output" columns.
+    """
+    options = "FORMAT JSON, VERBOSE" if verbose else "FORMAT JSON"
+    with conn.cursor() as cur:
+        cur.execute(f"EXPLAIN ({options}) " + sql_query, params)
+        plan = cur.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def walk_plan(node: Dict[str, Any]):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk_plan(child)
+
+
+def full_scans(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Seq Scan nodes over the watched tables."""
+    return [
+        node for node in walk_plan(plan)
+        if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in WATCHED_TABLES
+    ]
+
+
+def check_plan(sql_query: str, params=None, conn=None) -> List[str]:
+    """
+    EXPLAIN sql_query and return a warning for every full scan of a watched
+    table (an empty list means the plan only uses index lookups there).
+    """
+    if conn is not None:
+        plan = explain(conn, sql_query, params)
+    else:
+        with connection() as c:
+            plan = explain(c, sql_query, params)
+
+    warnings = []
+    for node in full_scans(plan):
+        warning = f"Full scan on {node['Relation Name']} (~{node.get('Plan Rows')} rows, cost {node.get('Total Cost')})"
+        if node.get("Filter"):
+            warning += f" filtering {node['Filter']}"
+        warnings.append(warning)
+    for warning in warnings:
+        print(f"⚠️ Query plan: {warning}")
+    return warnings
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Flag full table scans in the plan of a SQL agent query.")
+    parser.add_argument("sql", help="SQL text, as generated by run_agent (may use %%(float_ids)s)")
+    parser.add_argument("--float-ids", default="", help="comma-separated IDs bound to %%(float_ids)s")
+    args = parser.parse_args(argv)
+
+    float_ids = [fid.strip() for fid in args.float_ids.split(",") if fid.strip()]
+    warnings = check_plan(args.sql, {"float_ids": float_ids})
+    if not warnings:
+        print("✅ No full scans on watched tables")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+from make_json import read_mission_status, write_json_atomic
+
+
+def default_state_path(json_file) -> str:
+    return f"{json_file}.status_state.json"
+
+
+def find_meta_files(data_dir: Path) -> Dict[str, Path]:
+    """float_id -> its *_meta.nc file, from a single directory listing"""
+    meta_files = {}
+    for meta_file in sorted(data_dir.glob("*/*_meta.nc")):
+        meta_files.setdefault(meta_file.parent.name, meta_file)
+    return meta_files
+
+
+def load_state(state_file) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(state_file, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def file_signature(meta_file: Path) -> Dict[str, Any]:
+    st = meta_file.stat()
+    return {"meta_file": str(meta_file), "mtime": st.st_mtime, "size": st.st_size}
+
+
+def is_unchanged(entry: Optional[Dict[str, Any]], signature: Dict[str, Any]) -> bool:
+    return (
+        entry is not None
+        and entry.get("status") is not None
+        and all(entry.get(key) == value for key, value in signature.items())
+    )
+
+
+def read_statuses(meta_files: List[Path], workers: Optional[int] = None) -> List[str]:
+    """read_mission_status for each file, spread over a process pool"""
+    if len(meta_files) <= 1:
+        return [read_mission_status(f) for f in meta_files]
+    workers = min(workers or os.cpu_count() or 1, len(meta_files))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(read_mission_status, meta_files, chunksize=16))
+
+
+def update_status(json_file, data_dir, output_file=None, state_file=None, workers=None) -> Dict[str, int]:
+    """
+    Refresh the "status" of every float in json_file from END_MISSION_DATE in
+    its meta file. Only meta files that are new or whose mtime/size changed
+    since the last run are opened; the rest reuse the status recorded in the
+    state file. A meta file that cannot be read keeps the float's previous
+    status and is retried on the next run. The JSON is rewritten atomically,
+    and only when a status actually changed, so a running filter agent
+    reloads it only when needed.
+    """
+    json_file = Path(json_file)
+    data_dir = Path(data_dir)
+    out_path = Path(output_file) if output_file else json_file
+    state_file = state_file or default_state_path(out_path)
+
+    with open(json_file, "r") as f:
+        float_data = json.load(f)
+    state = load_state(state_file)
+    meta_files = find_meta_files(data_dir)
+
+    signatures, stale = {}, []
+    for float_id in float_data:
+        meta_file = meta_files.get(float_id)
+        if meta_file is None:
+            continue
+        try:
+            signatures[float_id] = file_signature(meta_file)
+        except OSError:
+            continue
+        if not is_unchanged(state.get(float_id), signatures[float_id]):
+            stale.append(float_id)
+
+    started = time.monotonic()
+    statuses = read_statuses([meta_files[float_id] for float_id in stale], workers)
+    new_state = {float_id: state.get(float_id) for float_id in signatures}
+    unreadable = set()
+    for float_id, status in zip(stale, statuses):
+        if status is None:
+            # Keep the old entry (and status) so the file is read again next run
+            unreadable.add(float_id)
+            continue
+        new_state[float_id] = dict(signatures[float_id], status=status)
+
+    changed = 0
+    for float_id, info in float_data.items():
+        if float_id in unreadable:
+            continue
+        entry = new_state.get(float_id)
+        if entry is None:
+            print(f"No meta file found for float {float_id}")
+        status = entry["status"] if entry else "inactive"
+        if info.get("status") != status:
+            info["status"] = status
+            changed += 1
+
+    if changed or out_path != json_file:
+        write_json_atomic(float_data, out_path)
+        print(f"✅ Updated {changed} float statuses in {out_path}")
+    else:
+        print(f"✅ All float statuses in {out_path} are current")
+    write_json_atomic(new_state, state_file)
+
+    print(f"Checked {len(stale)} of {len(signatures)} meta files in {time.monotonic() - started:.1f}s"
+          f"{f', {len(unreadable)} unreadable' if unreadable else ''}")
+    return {"floats": len(float_data), "checked": len(stale), "changed": changed, "unreadable": len(unreadable)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh float active/inactive status in meta_data.json from *_meta.nc files.")
+    parser.add_argument("json_file", help="float metadata JSON written by make_json.py")
+    parser.add_argument("data_dir", help="directory containing one sub-directory per float")
+    parser.add_argument("-o", "--output", default=None, help="output JSON file (default: update json_file in place)")
+    parser.add_argument("--state", default=None, help="mtime/status state file (default: next to the output JSON)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--full", action="store_true", help="ignore the state file and re-read every meta file")
+    args = parser.parse_args()
+
+    output = args.output or args.json_file
+    state_file = args.state or default_state_path(output)
+    if args.full and os.path.exists(state_file):
+        os.remove(state_file)
+    update_status(args.json_file, args.data_dir, args.output, state_file, args.workers)
+
+
+if __name__ == "__main__":
+    main()
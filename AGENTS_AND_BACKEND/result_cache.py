@@ -0,0 +1,155 @@
+import hashlib
+import os
+import pickle
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, Optional
+
+
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("ARGO_RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Set ARGO_RESULT_CACHE_DIR to keep results on disk as a second tier
+RESULT_CACHE_DIR = os.environ.get("ARGO_RESULT_CACHE_DIR")
+
+
+def normalize_sql(sql_query: str) -> str:
+    """Canonical form of generated SQL: single spaces outside literals, no trailing ';'."""
+    parts = re.split(r"('(?:[^']|'')*')", sql_query.strip().rstrip(";").strip())
+    return "".join(part if i % 2 else " ".join(part.split()) for i, part in enumerate(parts))
+
+
+# Part of every key; bump it when the shape of cached values changes
+RESULT_FORMAT = 4
+
+
+def result_key(sql_query: str, float_ids: Iterable[str]) -> str:
+    text = f"{RESULT_FORMAT}\n" + normalize_sql(sql_query) + "\n" + ",".join(sorted(set(map(str, float_ids))))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    LRU cache of SQL agent results, keyed by normalized SQL plus the sorted
+    float-ID set and tagged with the database's data version.
+
+    Entries are stored pickled, so the memory bound is exact and callers get a
+    fresh copy on every hit. When the data version changes (sql_setup.py bumps
+    it after each load) every older entry is dropped, in memory and on disk.
+    """
+
+    def __init__(self, max_bytes: int = RESULT_CACHE_MAX_BYTES, directory: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self.version = None
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str, version: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if not self._set_version(version):
+                self.misses += 1
+                return None
+            blob = self._entries.get(key)
+            if blob is not None:
+                self._entries.move_to_end(key)
+            elif self.directory:
+                blob = self._read(key)
+                if blob is not None:
+                    self._store(key, blob)
+            if blob is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return pickle.loads(blob)
+
+    def put(self, key: str, version: int, value: Dict[str, Any]):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            if not self._set_version(version):
+                return
+            self._store(key, blob)
+            if self.directory:
+                self._write(key, blob)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self.directory:
+                self._remove_files(keep_version=None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'version': self.version,
+            }
+
+    def _set_version(self, version: int) -> bool:
+        """Move to a newer data version; False if version is older than the current one."""
+        if version == self.version:
+            return True
+        if self.version is not None and version < self.version:
+            return False
+        self.version = version
+        self._entries.clear()
+        self._bytes = 0
+        if self.directory:
+            self._remove_files(keep_version=version)
+        return True
+
+    def _store(self, key: str, blob: bytes):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[key] = blob
+        self._bytes += len(blob)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{self.version}-{key}.pkl")
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write(self, key: str, blob: bytes):
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not save cached result to {path}: {e}")
+
+    def _remove_files(self, keep_version: Optional[int]):
+        prefix = f"{keep_version}-"
+        for name in os.listdir(self.directory):
+            if keep_version is None or not name.startswith(prefix):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+# Shared by every run_agent call in the process
+RESULT_CACHE = ResultCache(directory=RESULT_CACHE_DIR)
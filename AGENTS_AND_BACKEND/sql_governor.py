@@ -0,0 +1,119 @@
+import os
+import re
+from typing import Callable, List, Tuple
+
+from db import connection
+from query_plan import explain
+
+
+# Budget for a single generated query (estimated from EXPLAIN before it runs)
+MAX_ROWS = int(os.environ.get("ARGO_SQL_MAX_ROWS", "5000"))
+MAX_COLUMNS = int(os.environ.get("ARGO_SQL_MAX_COLUMNS", "24"))
+MAX_BYTES = int(os.environ.get("ARGO_SQL_MAX_BYTES", str(64 * 1024 * 1024)))
+# Tighter than the pool-wide statement_timeout; applied to each agent query
+QUERY_TIMEOUT_MS = int(os.environ.get("ARGO_SQL_QUERY_TIMEOUT_MS", "15000"))
+# Queries estimated above this many times the byte budget are rejected outright
+REJECT_FACTOR = 50
+
+# Columns that are never pruned, and the bulky ones pruned first
+KEY_COLUMNS = ["float_id", "cycle_number", "file_type", "juld", "latitude", "longitude"]
+PRUNABLE_SUFFIXES = ("_qc", "_adjusted_error")
+
+FORBIDDEN = re.compile(
+    r"\b(insert|update|delete|merge|drop|alter|create|truncate|grant|revoke|copy|vacuum|"
+    r"call|do|set|reset|lock|listen|notify|pg_sleep|dblink\w*|lo_\w+|pg_read_\w+)\b"
+)
+
+
+class QueryRejected(ValueError):
+    """Raised when generated SQL is unsafe or too expensive to run."""
+
+
+def strip_literals(sql_query: str) -> str:
+    return re.sub(r"'(?:[^']|'')*'", "''", sql_query)
+
+
+def check_statement(sql_query: str):
+    """Only a single read-only SELECT (or WITH ... SELECT) is allowed."""
+    text = strip_literals(sql_query).strip().rstrip(";").lower()
+    text = re.sub(r"--[^\n]*|/\*.*?\*/", " ", text, flags=re.S)
+    if ";" in text:
+        raise QueryRejected("Generated SQL contains more than one statement.")
+    if not re.match(r"\s*(select|with)\b", text):
+        raise QueryRejected("Generated SQL is not a SELECT query.")
+    match = FORBIDDEN.search(text)
+    if match:
+        raise QueryRejected(f"Generated SQL uses '{match.group(1)}', which is not allowed.")
+
+
+def estimate(conn, sql_query: str, params) -> Tuple[float, int]:
+    """(rows, bytes) for sql_query, from the planner's estimate."""
+    plan = explain(conn, sql_query, params)
+    rows = plan.get("Plan Rows", 0)
+    return rows, int(rows * plan.get("Plan Width", 0))
+
+
+def output_columns(conn, sql_query: str, params) -> List[str]:
+    """
+    Result column names of sql_query as the client will see them (aliases,
+    not the expressions behind them), without fetching any rows.
+    """
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT * FROM ({sql_query}) AS governed LIMIT 0", params)
+        return [desc[0] for desc in cur.description]
+
+
+def prune_columns(columns: List[str]) -> List[str]:
+    """Key columns plus as many others as MAX_COLUMNS allows, QC/error columns dropped."""
+    kept = [col for col in columns if col in KEY_COLUMNS or not col.endswith(PRUNABLE_SUFFIXES)]
+    extras = [col for col in kept if col not in KEY_COLUMNS]
+    return [col for col in kept if col in KEY_COLUMNS] + extras[:max(MAX_COLUMNS - len(KEY_COLUMNS), 0)]
+
+
+def govern(build: Callable[..., str], params, conn=None) -> Tuple[str, List[str]]:
+    """
+    Fit a query into the budget. build(columns=None, sample_every=1, limit=None)
+    must return the SQL for the requested shape. Over-budget queries are
+    rewritten step by step: prune QC/error columns, then extra columns, then
+    keep every n-th cycle, then LIMIT rows. Returns (sql, notes describing any
+    rewrite); raises QueryRejected if the query is unsafe or hopelessly large.
+    """
+    if conn is None:
+        with connection() as c:
+            return govern(build, params, c)
+
+    sql_query = build()
+    check_statement(sql_query)
+    rows, size = estimate(conn, sql_query, params)
+    if size > MAX_BYTES * REJECT_FACTOR:
+        raise QueryRejected(
+            f"This query would return about {size / 1e9:.1f} GB ({rows:.0f} profiles). "
+            "Please narrow it to fewer floats, a shorter date range or specific parameters."
+        )
+
+    notes = []
+    kept, sample_every, limit = None, 1, None
+    columns = output_columns(conn, sql_query, params)
+    if len(columns) > MAX_COLUMNS or size > MAX_BYTES:
+        kept = prune_columns(columns)
+        if len(kept) < len(columns):
+            notes.append(f"dropped {len(columns) - len(kept)} QC/error or extra columns")
+            sql_query = build(columns=kept)
+            rows, size = estimate(conn, sql_query, params)
+        else:
+            kept = None
+
+    if size > MAX_BYTES:
+        sample_every = int(-(-size // MAX_BYTES))
+        notes.append(f"kept one cycle in every {sample_every}")
+        sql_query = build(columns=kept, sample_every=sample_every)
+        rows, size = estimate(conn, sql_query, params)
+
+    if rows > MAX_ROWS:
+        limit = MAX_ROWS
+        notes.append(f"limited to {MAX_ROWS} profiles")
+        sql_query = build(columns=kept, sample_every=sample_every, limit=limit)
+
+    for note in notes:
+        print(f"⚖️ Query over budget: {note}")
+    return sql_query, notes
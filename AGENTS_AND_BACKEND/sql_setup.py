@@ -1,20 +1,22 @@
 import os, re
-import psycopg2
+import argparse
+import hashlib
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+
 import xarray as xr
 import numpy as np
+from psycopg2.extras import Json, execute_values
 
-# --- DB connection ---
-conn = psycopg2.connect(
-    host="localhost",
-    port=5432,
-    dbname="argo_db",
-    user="argo_user",
-    password="argo_pass"
+from db import connect
+from make_json import (
+    ArgoFloatProcessor, PARAM_MAPPING, RunningStats, convert_nan_to_null, read_mission_status, write_json_atomic,
 )
-cur = conn.cursor()
 
 
-cur.execute("""
+CREATE_TABLE_SQL = """
 CREATE TABLE IF NOT EXISTS argo_profiles (
     id SERIAL PRIMARY KEY,
     float_id VARCHAR(20) NOT NULL,
@@ -56,77 +58,562 @@ CREATE TABLE IF NOT EXISTS argo_profiles (
     chla_fluorescence_qc TEXT[],
     chla_fluorescence_adjusted REAL[],
     chla_fluorescence_adjusted_qc TEXT[],
-    chla_fluorescence_adjusted_error REAL[]
+    chla_fluorescence_adjusted_error REAL[],
+    file_type VARCHAR(2),
+    data_mode CHAR(1)
+);
+
+ALTER TABLE argo_profiles ADD COLUMN IF NOT EXISTS file_type VARCHAR(2);
+ALTER TABLE argo_profiles ADD COLUMN IF NOT EXISTS data_mode CHAR(1);
+CREATE UNIQUE INDEX IF NOT EXISTS argo_profiles_profile_key
+    ON argo_profiles (float_id, cycle_number, file_type);
+
+-- One row per ingested NetCDF file, used to skip unchanged files on re-runs
+CREATE TABLE IF NOT EXISTS argo_ingest_manifest (
+    path TEXT PRIMARY KEY,
+    size BIGINT NOT NULL,
+    mtime DOUBLE PRECISION NOT NULL,
+    checksum TEXT NOT NULL,
+    float_id VARCHAR(20),
+    cycle_number INT,
+    file_type VARCHAR(2),
+    data_mode CHAR(1),
+    stats JSONB,
+    ingested_at TIMESTAMP NOT NULL DEFAULT now()
+);
+ALTER TABLE argo_ingest_manifest ADD COLUMN IF NOT EXISTS data_mode CHAR(1);
+-- Per-file partial min/max/sum/count per parameter, merged into the float summaries
+ALTER TABLE argo_ingest_manifest ADD COLUMN IF NOT EXISTS stats JSONB;
+
+-- One meta_data.json entry per float, rebuilt from the manifest whenever its files change
+CREATE TABLE IF NOT EXISTS argo_float_summary (
+    float_id VARCHAR(20) PRIMARY KEY,
+    summary JSONB NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT now()
 );
-""")
-conn.commit()
+
+-- Bumped after every load that changes argo_profiles; the SQL agent's result cache keys on it
+CREATE TABLE IF NOT EXISTS argo_data_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO argo_data_version DEFAULT VALUES ON CONFLICT DO NOTHING;
+
+-- Per profile, parameter and standard pressure bin: count/min/max/mean of the
+-- values in [pres_min, pres_max). Lets aggregate questions skip the full arrays.
+CREATE TABLE IF NOT EXISTS argo_profile_bins (
+    float_id VARCHAR(20) NOT NULL,
+    cycle_number INT NOT NULL,
+    file_type VARCHAR(2) NOT NULL,
+    juld TIMESTAMP,
+    latitude DOUBLE PRECISION,
+    longitude DOUBLE PRECISION,
+    parameter TEXT NOT NULL,
+    pres_min REAL NOT NULL,
+    pres_max REAL NOT NULL,
+    count INT NOT NULL,
+    min REAL,
+    max REAL,
+    mean REAL,
+    PRIMARY KEY (float_id, cycle_number, file_type, parameter, pres_min)
+);
+CREATE INDEX IF NOT EXISTS argo_profile_bins_lookup_idx
+    ON argo_profile_bins (parameter, pres_min, juld);
+"""
+
+# argo_profiles_profile_key already serves (float_id, cycle_number) lookups.
+# The GiST index on point(longitude, latitude) serves bounding boxes
+# (point(longitude, latitude) <@ box(...)) and nearest-first ordering (<->),
+# which the SQL agent is told to write; a btree on (latitude, longitude) only
+# narrowed latitude. The BRIN index on juld stays small, but rows are loaded
+# float by float, so it only prunes well when the table is close to time
+# order (e.g. after a full --reset load of a time-sorted dataset); otherwise
+# the planner falls back to the float key or the position index.
+CREATE_INDEXES_SQL = """
+CREATE INDEX IF NOT EXISTS argo_profiles_juld_brin
+    ON argo_profiles USING brin (juld) WITH (pages_per_range = 32);
+DROP INDEX IF EXISTS argo_profiles_position_idx;
+CREATE INDEX IF NOT EXISTS argo_profiles_position_gist
+    ON argo_profiles USING gist (point(longitude, latitude));
+"""
+
+BUMP_DATA_VERSION_SQL = "UPDATE argo_data_version SET version = version + 1"
+
+# Run after each load so new rows are summarized and the planner has fresh statistics
+MAINTAIN_INDEXES_SQL = """
+SELECT brin_summarize_new_values('argo_profiles_juld_brin');
+ANALYZE argo_profiles;
+ANALYZE argo_profile_bins;
+"""
+
+# NetCDF variable prefix -> argo_profiles column prefix
+PROFILE_VARIABLES = {
+    "PRES": "pressure",
+    "TEMP": "temperature",
+    "PSAL": "salinity",
+    "DOXY": "doxy",
+    "CHLA": "chla",
+    "BBP700": "bbp700",
+    "CHLA_FLUORESCENCE": "chla_fluorescence",
+}
+VARIABLE_SUFFIXES = ["", "_QC", "_ADJUSTED", "_ADJUSTED_QC", "_ADJUSTED_ERROR"]
+
+PROFILE_COLUMNS = ["float_id", "cycle_number", "juld", "latitude", "longitude"] + [
+    column + suffix.lower()
+    for column in PROFILE_VARIABLES.values()
+    for suffix in VARIABLE_SUFFIXES
+] + ["file_type", "data_mode"]
+PROFILE_KEY = ["float_id", "cycle_number", "file_type"]
+
+# Argo data modes by precedence: delayed-mode over adjusted over real-time
+DATA_MODE_RANK = {"D": 2, "A": 1, "R": 0}
+
+
+def data_mode_rank(data_mode):
+    """Precedence of a data mode; unknown or missing modes rank below real-time."""
+    return DATA_MODE_RANK.get(data_mode, -1)
+
+
+def data_mode_rank_sql(column):
+    """SQL expression ranking column the same way as data_mode_rank."""
+    cases = " ".join(f"WHEN '{mode}' THEN {rank}" for mode, rank in DATA_MODE_RANK.items())
+    return f"(CASE {column} {cases} ELSE -1 END)"
+
+
+# A profile is identified by float, cycle and file type (D, BD or SD). A
+# delayed-mode file overwrites the real-time row for the same profile in place,
+# but a real-time file never replaces delayed-mode data.
+UPSERT_SQL = (
+    f"INSERT INTO argo_profiles ({', '.join(PROFILE_COLUMNS)}) VALUES %s "
+    f"ON CONFLICT ({', '.join(PROFILE_KEY)}) DO UPDATE SET "
+    + ", ".join(f"{col} = EXCLUDED.{col}" for col in PROFILE_COLUMNS if col not in PROFILE_KEY)
+    + f" WHERE {data_mode_rank_sql('EXCLUDED.data_mode')} >= {data_mode_rank_sql('argo_profiles.data_mode')}"
+    + " RETURNING float_id, cycle_number, file_type, data_mode"
+)
+
+# Standard pressure bin edges (dbar); bins are [edge, next edge)
+PRESSURE_BIN_EDGES = np.array([
+    0, 10, 20, 30, 50, 75, 100, 125, 150, 200, 250, 300, 400, 500, 600, 700,
+    800, 900, 1000, 1100, 1200, 1300, 1400, 1500, 1750, 2000, 2500, 3000, 4000, 6500,
+], dtype=float)
+# Parameters summarized per bin: every value column except pressure itself
+BINNED_PARAMETERS = [
+    column + suffix
+    for column in PROFILE_VARIABLES.values()
+    for suffix in ("", "_adjusted")
+    if column != "pressure"
+]
+BIN_COLUMNS = ["float_id", "cycle_number", "file_type", "juld", "latitude", "longitude",
+               "parameter", "pres_min", "pres_max", "count", "min", "max", "mean"]
+INSERT_BINS_SQL = f"INSERT INTO argo_profile_bins ({', '.join(BIN_COLUMNS)}) VALUES %s"
+DELETE_BINS_SQL = (
+    "DELETE FROM argo_profile_bins AS b USING (VALUES %s) AS v(float_id, cycle_number, file_type) "
+    "WHERE b.float_id = v.float_id AND b.cycle_number = v.cycle_number AND b.file_type = v.file_type"
+)
+
+MANIFEST_COLUMNS = ["path", "size", "mtime", "checksum", "float_id", "cycle_number", "file_type", "data_mode", "stats"]
+MANIFEST_UPSERT_SQL = (
+    f"INSERT INTO argo_ingest_manifest ({', '.join(MANIFEST_COLUMNS)}) VALUES %s "
+    "ON CONFLICT (path) DO UPDATE SET "
+    + ", ".join(f"{col} = EXCLUDED.{col}" for col in MANIFEST_COLUMNS if col not in ("path", "stats"))
+    # Unchanged files are recorded without re-decoding; keep their stats
+    + ", stats = COALESCE(EXCLUDED.stats, argo_ingest_manifest.stats), ingested_at = now()"
+)
+
+# Float summary statistics come from the core file for TEMP/PSAL/PRES and the
+# BGC file for the rest, so no value is counted twice; SD files merge the two.
+CORE_SUMMARY_PARAMS = ["TEMP", "PSAL", "PRES"]
+SUMMARY_PARAMS = {
+    "D": CORE_SUMMARY_PARAMS,
+    "BD": [param for param in PARAM_MAPPING if param not in CORE_SUMMARY_PARAMS],
+}
+# Best version of each profile file for a set of floats (delayed-mode over real-time)
+FLOAT_FILES_SQL = f"""
+SELECT DISTINCT ON (float_id, cycle_number, file_type) float_id, cycle_number, stats
+FROM argo_ingest_manifest
+WHERE float_id = ANY(%s)
+ORDER BY float_id, cycle_number, file_type, {data_mode_rank_sql('data_mode')} DESC
+"""
+UPSERT_SUMMARY_SQL = (
+    "INSERT INTO argo_float_summary (float_id, summary) VALUES %s "
+    "ON CONFLICT (float_id) DO UPDATE SET summary = EXCLUDED.summary, updated_at = now()"
+)
+META_DATA_PATH = os.environ.get(
+    "ARGO_META_DATA_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "meta_data.json")
+)
+
+DATASET_PATH = os.environ.get("ARGO_DATASET_PATH", "/Users/joyboy/Downloads/example/dataset")
+# Rows written per transaction; also bounds how many decoded profiles are held at once
+BATCH_SIZE = 200
+# Progress is printed at most this often
+REPORT_EVERY_SECONDS = 5.0
+# Real-time (R, BR, SR) files are skipped unless --realtime is passed
+PROFILE_PREFIXES = ("D", "BD", "SD")
+REALTIME_PREFIXES = ("R", "BR", "SR")
+
 
 def parse_filename(fname):
-    m = re.match(r"[BSD]?D?(\d+)_(\d+)\.nc", fname)
+    m = re.match(r"[BS]?[RD]?(\d+)_(\d+)\.nc", fname)
     return (m.group(1), int(m.group(2))) if m else (None, None)
 
+def parse_file_type(fname):
+    """(file_type, data_mode) for a profile file, e.g. BR... -> ("BD", "R")."""
+    m = re.match(r"([BS]?)([RD])\d", fname)
+    return (m.group(1) + "D", m.group(2)) if m else (None, None)
+
+def file_checksum(filepath, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 def safe(ds, var):
     if var in ds:
         arr = ds[var].values
-        return arr.flatten().astype(float).tolist() if np.issubdtype(arr.dtype, np.number) else arr.astype(str).flatten().tolist()
+        return arr.ravel().astype(float).tolist() if np.issubdtype(arr.dtype, np.number) else arr.astype(str).ravel().tolist()
     return None
 
+def file_summary_stats(ds, file_type):
+    """Partial float statistics from one profile file, as RunningStats dicts"""
+    stats = {}
+    for nc_param in SUMMARY_PARAMS.get(file_type, []):
+        if nc_param in ds:
+            running = RunningStats()
+            running.update_variable(ds[nc_param])
+            stats[PARAM_MAPPING[nc_param]] = running.to_dict()
+    return stats
+
 def process_nc(filepath):
-    ds = xr.open_dataset(filepath)
+    """Decode one profile file into an argo_profiles row and its partial float statistics."""
     fname = os.path.basename(filepath)
+    file_type, data_mode = parse_file_type(fname)
+    with xr.open_dataset(filepath) as ds:
+        # Drop unnecessary dimensions
+        if fname.startswith(("BD", "D", "BR", "R")):
+            if "N_HISTORY" in ds.dims: ds = ds.drop_dims("N_HISTORY")
+        if fname.startswith(("BD", "D", "SD", "BR", "R", "SR")):
+            if "N_PARAM" in ds.dims: ds = ds.drop_dims("N_PARAM")
+
+        float_id, cycle = parse_filename(fname)
+        if float_id is None:
+            raise ValueError(f"unrecognised profile file name {fname}")
+
+        juld = str(ds["JULD"].values[0]) if "JULD" in ds else None
+        lat = float(ds["LATITUDE"].values[0]) if "LATITUDE" in ds else None
+        lon = float(ds["LONGITUDE"].values[0]) if "LONGITUDE" in ds else None
+
+        values = [safe(ds, var + suffix) for var in PROFILE_VARIABLES for suffix in VARIABLE_SUFFIXES]
+        file_stats = file_summary_stats(ds, file_type)
+    return (float_id, cycle, juld, lat, lon, *values, file_type, data_mode), file_stats
+
+
+def profile_bins(row):
+    """
+    Depth-binned summaries for one decoded profile row, as argo_profile_bins
+    tuples. Adjusted parameters are binned on adjusted pressure when present.
+    """
+    values = dict(zip(PROFILE_COLUMNS, row))
+    float_id, cycle, file_type = values["float_id"], values["cycle_number"], values["file_type"]
+    bins = []
+    for parameter in BINNED_PARAMETERS:
+        data = values.get(parameter)
+        pressure = values.get("pressure_adjusted" if parameter.endswith("_adjusted") else "pressure")
+        if data is None or pressure is None or len(data) != len(pressure):
+            continue
+        data = np.asarray(data, dtype=float)
+        pressure = np.asarray(pressure, dtype=float)
+        index = np.searchsorted(PRESSURE_BIN_EDGES, pressure, side="right") - 1
+        valid = np.isfinite(data) & np.isfinite(pressure) & (index >= 0) & (index < len(PRESSURE_BIN_EDGES) - 1)
+        if not valid.any():
+            continue
+        data, index = data[valid], index[valid]
+        n_bins = len(PRESSURE_BIN_EDGES) - 1
+        counts = np.bincount(index, minlength=n_bins)
+        sums = np.bincount(index, weights=data, minlength=n_bins)
+        mins = np.full(n_bins, np.inf)
+        maxs = np.full(n_bins, -np.inf)
+        np.minimum.at(mins, index, data)
+        np.maximum.at(maxs, index, data)
+        for b in np.flatnonzero(counts):
+            bins.append((
+                float_id, cycle, file_type, values["juld"], values["latitude"], values["longitude"],
+                parameter, float(PRESSURE_BIN_EDGES[b]), float(PRESSURE_BIN_EDGES[b + 1]),
+                int(counts[b]), float(mins[b]), float(maxs[b]), float(sums[b] / counts[b]),
+            ))
+    return bins
+
+
+def _decode(task):
+    """
+    Worker entry point: checksum the file and decode it unless the checksum
+    matches the manifest. Never raises, so one bad file cannot stop the pool.
+    Returns (task, checksum, decoded, error), where decoded is
+    (row, bins, file_stats) or None for unchanged files.
+    """
+    filepath, _, _, known_checksum = task
+    try:
+        checksum = file_checksum(filepath)
+        if checksum == known_checksum:
+            return task, checksum, None, None
+        row, file_stats = process_nc(filepath)
+        return task, checksum, (row, profile_bins(row), file_stats), None
+    except Exception as e:
+        return task, None, None, f"{type(e).__name__}: {e}"
+
+
+def find_profile_files(dataset_path, realtime=False):
+    prefixes = PROFILE_PREFIXES + (REALTIME_PREFIXES if realtime else ())
+    for root, _, files in os.walk(dataset_path):
+        for fname in sorted(files):
+            if fname.endswith(".nc") and fname.startswith(prefixes):
+                yield os.path.join(root, fname)
+
+
+def load_manifest(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT path, size, mtime, checksum FROM argo_ingest_manifest")
+        return {path: (size, mtime, checksum) for path, size, mtime, checksum in cur}
+
+
+def changed_files(paths, manifest, stats):
+    """
+    Yield (path, size, mtime, known_checksum) for files that are new or whose
+    size/mtime differ from the manifest; the rest are skipped without being read.
+    """
+    for path in paths:
+        st = os.stat(path)
+        known = manifest.get(path)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime:
+            stats.skipped += 1
+            continue
+        yield path, st.st_size, st.st_mtime, known[2] if known else None
+
+
+def decode_files(tasks, workers):
+    """
+    Decode files in a process pool, yielding _decode results as they finish.
+    At most a few tasks per worker are in flight, so memory stays bounded no
+    matter how large the dataset is.
+    """
+    max_pending = workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for task in tasks:
+            pending.add(executor.submit(_decode, task))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in pending:
+            yield future.result()
+
+
+class IngestStats:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.last_report = self.started
+        self.files = 0
+        self.rows = 0
+        self.skipped = 0
+        self.failed = []
+
+    def report(self, force=False):
+        now = time.monotonic()
+        if not force and now - self.last_report < REPORT_EVERY_SECONDS:
+            return
+        self.last_report = now
+        elapsed = max(now - self.started, 1e-9)
+        print(f"📥 {self.files} files ({self.files / elapsed:.1f} files/s), "
+              f"{self.rows} rows ({self.rows / elapsed:.1f} rows/s), "
+              f"{self.skipped} unchanged, {len(self.failed)} failed")
+
+
+def write_batch(conn, rows, bins, manifest_entries):
+    """
+    Upsert profiles, replace the depth bins of every profile actually written,
+    record the files in the manifest and bump the data version, all in one
+    transaction. bins maps (float_id, cycle_number, file_type, data_mode) to
+    that row's argo_profile_bins tuples.
+    """
+    # ON CONFLICT cannot touch the same row twice in one statement; keep the
+    # delayed-mode row when a batch holds both versions of a profile
+    latest = {}
+    for row in rows:
+        key = (row[0], row[1], row[-2])
+        if key not in latest or data_mode_rank(row[-1]) >= data_mode_rank(latest[key][-1]):
+            latest[key] = row
+    with conn.cursor() as cur:
+        if latest:
+            written = execute_values(cur, UPSERT_SQL, list(latest.values()), page_size=len(latest), fetch=True)
+            if written:
+                # Rows a real-time file was not allowed to overwrite keep their bins too
+                execute_values(cur, DELETE_BINS_SQL, [key[:3] for key in written], page_size=len(written))
+                new_bins = [b for key in written for b in bins.get(tuple(key), [])]
+                if new_bins:
+                    execute_values(cur, INSERT_BINS_SQL, new_bins, page_size=1000)
+            cur.execute(BUMP_DATA_VERSION_SQL)
+        execute_values(cur, MANIFEST_UPSERT_SQL, manifest_entries, page_size=len(manifest_entries))
+    conn.commit()
+
+
+def find_meta_file(profile_path, float_id):
+    """<float>_meta.nc next to the profile file or one level up (GDAC layout: <float>/profiles/)"""
+    profile_dir = os.path.dirname(profile_path)
+    for directory in (profile_dir, os.path.dirname(profile_dir)):
+        candidate = os.path.join(directory, f"{float_id}_meta.nc")
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def _summarize_float(task):
+    """Worker entry point: meta file fields, mission status and merged statistics for one float."""
+    float_id, meta_file, stats, cycles, last_updated = task
+    processor = ArgoFloatProcessor(os.path.dirname(meta_file) if meta_file else ".")
+    info = processor.build_float_info(float_id, meta_file, stats, cycles)
+    status = read_mission_status(meta_file) if meta_file else "inactive"
+    if status is not None:
+        # Unreadable meta file: leave status empty so the existing entry keeps its value
+        info["status"] = status
+    info["last_updated"] = last_updated
+    return float_id, convert_nan_to_null(info)
+
+
+def merge_float_entry(existing, info):
+    """New summary over an existing meta_data.json entry; empty new fields ("" or None) keep old values."""
+    merged = dict(existing)
+    for key, value in info.items():
+        if value not in ("", None) or key not in existing:
+            merged[key] = value
+    return merged
+
+
+def update_float_summaries(conn, float_ids, meta_files, workers, meta_json=META_DATA_PATH):
+    """
+    Rebuild the argo_float_summary rows of float_ids from the per-file stats in
+    the manifest, so no profile file is read again, then refresh their entries
+    in meta_json (skipped when meta_json is empty).
+    """
+    running = {fid: {key: RunningStats() for key in PARAM_MAPPING.values()} for fid in float_ids}
+    cycles = dict.fromkeys(float_ids, 0)
+    missing_stats = 0
+    with conn.cursor() as cur:
+        cur.execute(FLOAT_FILES_SQL, (list(float_ids),))
+        for float_id, cycle, file_stats in cur:
+            cycles[float_id] = max(cycles[float_id], cycle or 0)
+            if file_stats is None:
+                # Ingested before the manifest kept per-file stats
+                missing_stats += 1
+            for key, partial in (file_stats or {}).items():
+                running[float_id][key].merge(RunningStats.from_dict(partial))
+
+    if missing_stats:
+        print(f"⚠️ {missing_stats} files have no stored statistics; run once with --reset for complete summaries")
+
+    last_updated = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    tasks = []
+    for float_id in float_ids:
+        stats = {}
+        for key, accumulator in running[float_id].items():
+            stats[f"{key}_min"], stats[f"{key}_max"], stats[f"{key}_avg"] = accumulator.result()
+        tasks.append((float_id, meta_files.get(float_id), stats, cycles[float_id], last_updated))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        summaries = dict(executor.map(_summarize_float, tasks, chunksize=16))
+
+    with conn.cursor() as cur:
+        execute_values(cur, UPSERT_SUMMARY_SQL, [(fid, Json(info)) for fid, info in summaries.items()], page_size=500)
+    conn.commit()
+    print(f"🧾 Updated summaries for {len(summaries)} floats")
+
+    if meta_json:
+        float_data = {}
+        if os.path.exists(meta_json):
+            with open(meta_json, "r") as f:
+                float_data = json.load(f)
+        for float_id, info in summaries.items():
+            float_data[float_id] = merge_float_entry(float_data.get(float_id, {}), info)
+        write_json_atomic({fid: float_data[fid] for fid in sorted(float_data)}, meta_json)
+        print(f"🧾 Wrote {len(float_data)} floats to {meta_json}")
+
+
+def ingest(dataset_path=DATASET_PATH, workers=None, batch_size=BATCH_SIZE, realtime=False, reset=False,
+           meta_json=META_DATA_PATH):
+    workers = workers or os.cpu_count() or 1
+    stats = IngestStats()
+    conn = connect()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(CREATE_TABLE_SQL)
+            cur.execute(CREATE_INDEXES_SQL)
+            if reset:
+                cur.execute("TRUNCATE argo_profiles, argo_profile_bins, argo_ingest_manifest, argo_float_summary")
+                cur.execute(BUMP_DATA_VERSION_SQL)
+        conn.commit()
+
+        manifest = load_manifest(conn)
+        tasks = changed_files(find_profile_files(dataset_path, realtime), manifest, stats)
+        rows, bins, entries = [], {}, []
+        touched, meta_files = set(), {}
+        for (path, size, mtime, _), checksum, decoded, error in decode_files(tasks, workers):
+            stats.files += 1
+            if error:
+                stats.failed.append((path, error))
+                print(f"❌ Failed {os.path.basename(path)}: {error}")
+                continue
+            fname = os.path.basename(path)
+            float_id, cycle = parse_filename(fname)
+            if decoded is None:
+                # Touched but identical: only the manifest's mtime needs updating
+                stats.skipped += 1
+                entries.append((path, size, mtime, checksum, float_id, cycle, *parse_file_type(fname), None))
+            else:
+                row, row_bins, file_stats = decoded
+                rows.append(row)
+                bins[(row[0], row[1], row[-2], row[-1])] = row_bins
+                entries.append((path, size, mtime, checksum, float_id, cycle, row[-2], row[-1], Json(file_stats)))
+                touched.add(float_id)
+                if float_id not in meta_files:
+                    meta_files[float_id] = find_meta_file(path, float_id)
+            if len(entries) >= batch_size:
+                write_batch(conn, rows, bins, entries)
+                stats.rows += len(rows)
+                rows, bins, entries = [], {}, []
+            stats.report()
+        if entries:
+            write_batch(conn, rows, bins, entries)
+            stats.rows += len(rows)
+
+        with conn.cursor() as cur:
+            cur.execute(MAINTAIN_INDEXES_SQL)
+        conn.commit()
+
+        if touched:
+            update_float_summaries(conn, sorted(touched), meta_files, workers, meta_json)
+    finally:
+        conn.close()
+
+    stats.report(force=True)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load Argo profile NetCDF files into argo_profiles.")
+    parser.add_argument("dataset_path", nargs="?", default=DATASET_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="decoder processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per transaction")
+    parser.add_argument("--realtime", action="store_true", help="also load real-time (R, BR, SR) files")
+    parser.add_argument("--reset", action="store_true", help="empty argo_profiles and the manifest first")
+    parser.add_argument("--meta-json", default=META_DATA_PATH,
+                        help="float metadata JSON to update from this load ('' to skip)")
+    args = parser.parse_args()
+
+    stats = ingest(args.dataset_path, args.workers, args.batch_size, args.realtime, args.reset, args.meta_json)
+    print(f"✅ Upserted {stats.rows} profiles from {stats.files} files ({stats.skipped} unchanged)")
+    if stats.failed:
+        print(f"⚠️ {len(stats.failed)} files failed to load")
+
 
-    # Drop unnecessary dimensions
-    if fname.startswith("BD") or fname.startswith("D"):
-        if "N_HISTORY" in ds.dims: ds = ds.drop_dims("N_HISTORY")
-    if fname.startswith(("BD","D","SD")):
-        if "N_PARAM" in ds.dims: ds = ds.drop_dims("N_PARAM")
-
-    float_id, cycle = parse_filename(fname)
-
-    juld = str(ds["JULD"].values[0]) if "JULD" in ds else None
-    lat = float(ds["LATITUDE"].values[0]) if "LATITUDE" in ds else None
-    lon = float(ds["LONGITUDE"].values[0]) if "LONGITUDE" in ds else None
-
-    return (
-        float_id, cycle, juld, lat, lon,
-        safe(ds,"PRES"), safe(ds,"PRES_QC"), safe(ds,"PRES_ADJUSTED"), safe(ds,"PRES_ADJUSTED_QC"), safe(ds,"PRES_ADJUSTED_ERROR"),
-        safe(ds,"TEMP"), safe(ds,"TEMP_QC"), safe(ds,"TEMP_ADJUSTED"), safe(ds,"TEMP_ADJUSTED_QC"), safe(ds,"TEMP_ADJUSTED_ERROR"),
-        safe(ds,"PSAL"), safe(ds,"PSAL_QC"), safe(ds,"PSAL_ADJUSTED"), safe(ds,"PSAL_ADJUSTED_QC"), safe(ds,"PSAL_ADJUSTED_ERROR"),
-        safe(ds,"DOXY"), safe(ds,"DOXY_QC"), safe(ds,"DOXY_ADJUSTED"), safe(ds,"DOXY_ADJUSTED_QC"), safe(ds,"DOXY_ADJUSTED_ERROR"),
-        safe(ds,"CHLA"), safe(ds,"CHLA_QC"), safe(ds,"CHLA_ADJUSTED"), safe(ds,"CHLA_ADJUSTED_QC"), safe(ds,"CHLA_ADJUSTED_ERROR"),
-        safe(ds,"BBP700"), safe(ds,"BBP700_QC"), safe(ds,"BBP700_ADJUSTED"), safe(ds,"BBP700_ADJUSTED_QC"), safe(ds,"BBP700_ADJUSTED_ERROR"),
-        safe(ds,"CHLA_FLUORESCENCE"), safe(ds,"CHLA_FLUORESCENCE_QC"), safe(ds,"CHLA_FLUORESCENCE_ADJUSTED"),
-        safe(ds,"CHLA_FLUORESCENCE_ADJUSTED_QC"), safe(ds,"CHLA_FLUORESCENCE_ADJUSTED_ERROR")
-    )
-
-DATASET_PATH = "/Users/joyboy/Downloads/example/dataset"
-
-for root, _, files in os.walk(DATASET_PATH):
-    for fname in files:
-        if fname.endswith(".nc") and (fname.startswith("D") or fname.startswith("BD") or fname.startswith("SD")):
-            row = process_nc(os.path.join(root, fname))
-            cur.execute("""
-                INSERT INTO argo_profiles (
-                    float_id, cycle_number, juld, latitude, longitude,
-                    pressure, pressure_qc, pressure_adjusted, pressure_adjusted_qc, pressure_adjusted_error,
-                    temperature, temperature_qc, temperature_adjusted, temperature_adjusted_qc, temperature_adjusted_error,
-                    salinity, salinity_qc, salinity_adjusted, salinity_adjusted_qc, salinity_adjusted_error,
-                    doxy, doxy_qc, doxy_adjusted, doxy_adjusted_qc, doxy_adjusted_error,
-                    chla, chla_qc, chla_adjusted, chla_adjusted_qc, chla_adjusted_error,
-                    bbp700, bbp700_qc, bbp700_adjusted, bbp700_adjusted_qc, bbp700_adjusted_error,
-                    chla_fluorescence, chla_fluorescence_qc, chla_fluorescence_adjusted,
-                    chla_fluorescence_adjusted_qc, chla_fluorescence_adjusted_error
-                ) VALUES (%s,%s,%s,%s,%s,
-                          %s,%s,%s,%s,%s,
-                          %s,%s,%s,%s,%s,
-                          %s,%s,%s,%s,%s,
-                          %s,%s,%s,%s,%s,
-                          %s,%s,%s,%s,%s,
-                          %s,%s,%s,%s,%s,
-                          %s,%s,%s,%s,%s);
-            """, row)
-            conn.commit()
-            print(f"✅ Inserted {fname}")
-
-cur.close()
-conn.close()
+if __name__ == "__main__":
+    main()
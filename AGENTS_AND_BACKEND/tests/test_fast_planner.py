@@ -0,0 +1,65 @@
+import pytest
+
+from fast_planner import REGIONS, FastPlanner
+
+
+def plan(query):
+    return FastPlanner().plan(query)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Find floats in the Bay of Bengal",
+     [{'tool_name': 'filter_by_coordinates', 'parameters': dict(REGIONS['Bay of Bengal'])}]),
+    ("one float in bay of bengal",
+     [{'tool_name': 'filter_by_coordinates', 'parameters': dict(REGIONS['Bay of Bengal'], k=1)}]),
+    ("show 5 deepest floats",
+     [{'tool_name': 'find_extreme_values', 'parameters': {'parameter': 'pres', 'extreme_type': 'max', 'k': 5}}]),
+    ("find the hottest float",
+     [{'tool_name': 'find_extreme_values', 'parameters': {'parameter': 'temperature', 'extreme_type': 'max', 'k': 1}}]),
+    ("floats launched between 2015 and 2018",
+     [{'tool_name': 'filter_by_date_range', 'parameters': {'start_date': '2015-01-01', 'end_date': '2018-12-31'}}]),
+    ("floats in 2018",
+     [{'tool_name': 'filter_by_date_range', 'parameters': {'start_date': '2018-01-01', 'end_date': '2018-12-31'}}]),
+    ("floats before 2010",
+     [{'tool_name': 'filter_by_date_range', 'parameters': {'start_date': '1900-01-01', 'end_date': '2009-12-31'}}]),
+    ("floats with temperature above 25",
+     [{'tool_name': 'filter_by_parameter_value', 'parameters': {'parameter': 'temperature', 'operator': '>', 'value': 25}}]),
+    ("salinity less than or equal to 35.5",
+     [{'tool_name': 'filter_by_parameter_value', 'parameters': {'parameter': 'salinity', 'operator': '<=', 'value': 35.5}}]),
+    ("floats with minimum temperature above 20 in Arabian Sea",
+     [{'tool_name': 'filter_by_coordinates', 'parameters': dict(REGIONS['Arabian Sea'])},
+      {'tool_name': 'filter_by_parameter_value', 'parameters': {'parameter': 'temp_min', 'operator': '>', 'value': 20}}]),
+    ("APEX floats in the Indian Ocean",
+     [{'tool_name': 'filter_by_coordinates', 'parameters': dict(REGIONS['Indian Ocean'])},
+      {'tool_name': 'filter_by_platform_type', 'parameters': {'platform_type': 'APEX'}}]),
+])
+def test_plans_supported_queries(query, expected):
+    assert plan(query) == expected
+
+
+def test_after_year_starts_the_following_year():
+    (call,) = plan("floats deployed after 2020")
+    assert call['tool_name'] == 'filter_by_date_range'
+    assert call['parameters']['start_date'] == '2021-01-01'
+
+
+@pytest.mark.parametrize("query", [
+    "floats not in the indian ocean",        # negation
+    "nearest float to 10, 20",               # proximity
+    "compare salinity in two regions",       # comparison
+    "floats in the Bay of Bengal and the Arabian Sea",  # two regions
+    "floats from 2019 to 2015",              # reversed range
+    "hottest floats",                        # ranking without a count
+    "top 3 coldest floats in Arabian Sea",   # limit with several tool calls
+    "floats with unusual drift patterns",    # unrecognised words
+    "show me the data",                      # nothing to filter on
+])
+def test_falls_back_to_the_llm(query):
+    assert plan(query) is None
+
+
+def test_counts_hits_and_misses():
+    planner = FastPlanner()
+    planner.plan("floats in 2018")
+    planner.plan("floats not in 2018")
+    assert planner.stats() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from float_index import SpatialGrid, haversine_km
+
+
+@pytest.fixture(scope="module")
+def positions():
+    rng = np.random.default_rng(7)
+    lat = rng.uniform(-90, 90, 2000)
+    lon = rng.uniform(-180, 180, 2000)
+    lat[:5] = np.nan
+    return lat, lon
+
+
+def brute_box(lat, lon, lat_min, lat_max, lon_min, lon_max):
+    inside = (lat >= lat_min) & (lat <= lat_max)
+    if lon_min > lon_max:
+        inside &= (lon >= lon_min) | (lon <= lon_max)
+    else:
+        inside &= (lon >= lon_min) & (lon <= lon_max)
+    return np.flatnonzero(inside)
+
+
+@pytest.mark.parametrize("box", [
+    (5, 22, 80, 95),
+    (-30, 30, 30, 120),
+    (-10, 10, 170, -170),   # crosses the antimeridian
+    (-90, 90, -180, 180),
+    (0.5, 0.7, 0.1, 0.2),   # inside one cell
+])
+def test_box_matches_brute_force(positions, box):
+    lat, lon = positions
+    np.testing.assert_array_equal(SpatialGrid(lat, lon).box(*box), brute_box(lat, lon, *box))
+
+
+def test_box_spanning_360_degrees_covers_every_longitude(positions):
+    lat, lon = positions
+    np.testing.assert_array_equal(SpatialGrid(lat, lon).box(-20, 20, 0, 360), brute_box(lat, lon, -20, 20, -180, 180))
+
+
+def test_box_with_inverted_latitudes_is_empty(positions):
+    lat, lon = positions
+    assert SpatialGrid(lat, lon).box(10, -10, 0, 10).size == 0
+
+
+@pytest.mark.parametrize("lat0, lon0, k", [(12, 85, 1), (12, 85, 10), (-70, 179.5, 5), (89, 0, 3)])
+def test_nearest_matches_brute_force(positions, lat0, lon0, k):
+    lat, lon = positions
+    found, distances = SpatialGrid(lat, lon).nearest(lat0, lon0, k=k)
+    all_distances = haversine_km(lat0, lon0, lat, lon)
+    valid = np.flatnonzero(~np.isnan(all_distances))
+    expected = valid[np.lexsort((valid, all_distances[valid]))][:k]
+    np.testing.assert_array_equal(found, expected)
+    np.testing.assert_allclose(distances, all_distances[expected])
+
+
+def test_nearest_within_radius(positions):
+    lat, lon = positions
+    found, distances = SpatialGrid(lat, lon).nearest(0, 0, k=None, radius_km=1500)
+    all_distances = haversine_km(0, 0, lat, lon)
+    assert set(found.tolist()) == set(np.flatnonzero(all_distances <= 1500).tolist())
+    assert np.all(np.diff(distances) >= 0)
+
+
+def test_nearest_on_empty_grid():
+    found, distances = SpatialGrid(np.array([np.nan]), np.array([np.nan])).nearest(0, 0, k=3)
+    assert found.size == 0 and distances.size == 0
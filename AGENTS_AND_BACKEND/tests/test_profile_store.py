@@ -0,0 +1,52 @@
+import pytest
+
+from profile_store import StoreQueryError, translate_sql, year_window
+
+
+def test_translate_binds_float_ids_and_unescapes_percent():
+    sql = translate_sql("SELECT * FROM argo_profiles WHERE float_id = ANY(%(float_ids)s) AND project LIKE 'A%%'")
+    assert sql == "SELECT * FROM argo_profiles WHERE float_id = ANY($float_ids) AND project LIKE 'A%'"
+
+
+def test_translate_box_accepts_corners_in_any_order():
+    sql = translate_sql("SELECT 1 WHERE point(longitude, latitude) <@ box(point(95, 22), point(80, 5))")
+    assert sql == ("SELECT 1 WHERE (longitude BETWEEN least(95, 80) AND greatest(95, 80) "
+                   "AND latitude BETWEEN least(22, 5) AND greatest(22, 5))")
+
+
+def test_translate_distance():
+    sql = translate_sql("SELECT 1 ORDER BY point(longitude, latitude) <-> point(85.5, -12)")
+    assert sql == "SELECT 1 ORDER BY sqrt(power((longitude) - (85.5), 2) + power((latitude) - (-12), 2))"
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT 1 WHERE point(longitude, latitude) <@ circle(point(0, 0), 5)",
+    "SELECT 1 WHERE box(point(0, 0), point(1, 1)) && box(point(0, 0), point(2, 2))",
+])
+def test_translate_rejects_other_geometric_operators(sql):
+    with pytest.raises(StoreQueryError):
+        translate_sql(sql)
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT * FROM argo_profiles WHERE juld >= '2020-01-01'", (2020, None)),
+    ("SELECT * FROM argo_profiles WHERE juld < '2019-06-01' AND juld > '2015-01-01'", (2015, 2019)),
+    ("SELECT * FROM argo_profiles WHERE juld BETWEEN timestamp '2018-01-01' AND '2018-12-31'", (2018, 2018)),
+    ("SELECT * FROM argo_profiles", (None, None)),
+    # Pruning could change the answer
+    ("SELECT * FROM argo_profiles WHERE juld >= '2020-01-01' OR cycle_number = 1", (None, None)),
+    ("SELECT * FROM argo_profiles WHERE NOT juld < '2020-01-01'", (None, None)),
+    ("SELECT * FROM argo_profiles WHERE float_id IN (SELECT float_id FROM argo_profiles WHERE juld > '2020-01-01')",
+     (None, None)),
+])
+def test_year_window(sql, expected):
+    assert year_window(sql) == expected
+
+
+def test_translated_box_runs_in_duckdb():
+    duckdb = pytest.importorskip("duckdb")
+    sql = translate_sql(
+        "SELECT id FROM (VALUES (1, 85.0, 10.0), (2, 60.0, 10.0)) AS t(id, longitude, latitude) "
+        "WHERE point(longitude, latitude) <@ box(point(80, 5), point(95, 22))"
+    )
+    assert duckdb.connect().execute(sql).fetchall() == [(1,)]
@@ -0,0 +1,45 @@
+import math
+
+import numpy as np
+import pytest
+
+pytest.importorskip("xarray")
+pytest.importorskip("pandas")
+from make_json import RunningStats  # noqa: E402
+
+
+def stats_of(*chunks):
+    running = RunningStats()
+    for chunk in chunks:
+        running.update(chunk)
+    return running
+
+
+def test_merge_equals_one_pass():
+    first, second = [1.0, np.nan, 5.0], [-2.0, 3.0]
+    merged = stats_of(first)
+    merged.merge(stats_of(second))
+    assert merged.to_dict() == stats_of(first, second).to_dict()
+    assert merged.result() == (-2.0, 5.0, 7.0 / 4)
+
+
+def test_merge_with_empty_keeps_values():
+    merged = stats_of([4.0, 6.0])
+    merged.merge(stats_of([np.nan]))
+    assert merged.result() == (4.0, 6.0, 5.0)
+
+    empty = RunningStats()
+    empty.merge(stats_of([4.0, 6.0]))
+    assert empty.result() == (4.0, 6.0, 5.0)
+
+
+def test_merge_propagates_invalid():
+    merged = stats_of([1.0])
+    merged.merge(stats_of(["not a number"]))
+    assert all(math.isnan(value) for value in merged.result())
+
+
+def test_dict_round_trip_then_merge():
+    restored = RunningStats.from_dict(stats_of([1.0, 2.0]).to_dict())
+    restored.merge(RunningStats.from_dict(stats_of([]).to_dict()))
+    assert restored.result() == (1.0, 2.0, 1.5)